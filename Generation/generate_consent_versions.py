@@ -22,19 +22,38 @@ Usage:
 
 import argparse
 import csv
+import functools
+import itertools
 import json
+import os
 import random
 import sys
-import uuid
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 TODAY = date(2025, 9, 21)  # keep dates stable for reproducibility
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+
+# End of TODAY, computed once (as datetime and as EPOCH seconds)
+TODAY_END = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=23, minutes=59, seconds=59)
+TODAY_END_S = int((TODAY_END - EPOCH).total_seconds())
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Rows formatted per os.urandom read while streaming output
+ID_BATCH = 4096
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
 
 # ---------------------------
 # Helpers
 # ---------------------------
+@functools.lru_cache(maxsize=None)  # versions often share effectiveFrom/effectiveTo boundaries
 def parse_dt(s: str) -> Optional[datetime]:
     s = (s or "").strip()
     if not s:
@@ -49,8 +68,35 @@ def parse_dt(s: str) -> Optional[datetime]:
     except Exception:
         return None
 
-def today_end_dt() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=23, minutes=59, seconds=59)
+def to_seconds(dt: datetime) -> int:
+    return int((dt - EPOCH).total_seconds())
+
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
 # Input readers
@@ -67,12 +113,14 @@ def read_participant_ids(path: str) -> List[str]:
             key = "participant_id" if "participant_id" in data[0] else "id"
             return [row[key] for row in data if row.get(key)]
         return [str(x) for x in data]
-    with open(p, "r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames or ("participant_id" not in r.fieldnames and "id" not in r.fieldnames):
+    with open(p, "r", encoding="utf-8", newline="") as f:
+        # Plain csv.reader + one column index: no per-row dict, and only the id column is kept
+        r = csv.reader(f)
+        header = next(r, None)
+        if not header or ("participant_id" not in header and "id" not in header):
             raise ValueError("Participants CSV must include 'participant_id' (or 'id').")
-        key = "participant_id" if "participant_id" in r.fieldnames else "id"
-        return [row[key] for row in r if row.get(key)]
+        i = header.index("participant_id" if "participant_id" in header else "id")
+        return [row[i] for row in r if len(row) > i and row[i]]
 
 def read_consent_versions(path: str) -> List[Dict[str, Any]]:
     """
@@ -92,76 +140,163 @@ def read_consent_versions(path: str) -> List[Dict[str, Any]]:
                 "_to": parse_dt(row.get("effectiveTo", "")),
             })
     else:
-        with open(p, "r", encoding="utf-8") as f:
-            r = csv.DictReader(f)
+        with open(p, "r", encoding="utf-8", newline="") as f:
+            r = csv.reader(f)
+            header = next(r, None)
             need = {"consent_version_id", "effectiveFrom", "effectiveTo"}
-            if not r.fieldnames or not need.issubset(set(r.fieldnames)):
+            if not header or not need.issubset(set(header)):
                 raise ValueError("Consent versions CSV must include: consent_version_id,effectiveFrom,effectiveTo")
+            # Positional lookups for the three columns we need
+            id_i = header.index("consent_version_id")
+            from_i = header.index("effectiveFrom")
+            to_i = header.index("effectiveTo")
+            width = max(id_i, from_i, to_i) + 1
             for row in r:
+                if not row:
+                    continue
+                if len(row) < width:
+                    row += [""] * (width - len(row))
                 rows.append({
-                    "consent_version_id": row["consent_version_id"],
-                    "_from": parse_dt(row["effectiveFrom"]),
-                    "_to": parse_dt(row.get("effectiveTo", "")),
+                    "consent_version_id": row[id_i],
+                    "_from": parse_dt(row[from_i]),
+                    "_to": parse_dt(row[to_i]),
                 })
-    end_today = today_end_dt()
+    end_today = TODAY_END
     # keep only versions whose effectiveFrom has begun
     return [r for r in rows if r["_from"] and r["_from"] <= end_today]
 
 # ---------------------------
 # Core generation
 # ---------------------------
-def pick_signed(eff_from: datetime, eff_to: Optional[datetime]) -> Optional[datetime]:
-    end = min(eff_to or today_end_dt(), today_end_dt())
-    if end < eff_from:
+def pick_signed(from_s: int, span_s: int, r: float) -> int:
+    """Map a uniform draw r in [0, 1) onto a signing time (epoch seconds) inside the version window."""
+    return from_s + int(r * (span_s + 1))
+
+def maybe_withdraw(signed_s: int, last_s: int, rate: float, u: float, r: float) -> Optional[int]:
+    """u gates the withdrawal against rate; r places it between signed_s and the window end last_s."""
+    if u >= rate:
         return None
-    delta = int((end - eff_from).total_seconds())
-    return eff_from + timedelta(seconds=random.randint(0, max(0, delta)))
-
-def maybe_withdraw(signed_at: datetime, eff_to: Optional[datetime], rate: float) -> str:
-    if random.random() >= rate:
-        return ""
-    last = min(eff_to or today_end_dt(), today_end_dt())
-    if last <= signed_at:
-        return ""
-    delta = int((last - signed_at).total_seconds())
-    when = signed_at + timedelta(seconds=random.randint(60, max(60, delta)))
-    if when > last:
-        when = last
-    return when.isoformat(timespec="seconds")
-
-def make_rows(
-    participants: List[str],
-    versions: List[Dict[str, Any]],
+    if last_s <= signed_s:
+        return None
+    delta = last_s - signed_s
+    when = signed_s + 60 + int(r * (max(60, delta) - 59))
+    if when > last_s:
+        when = last_s
+    return when
+
+def version_windows(versions: List[Dict[str, Any]]) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Flatten version windows into parallel (from_s, to_s, span_s) lists, computed once.
+    to_s is effectiveTo clamped to the end of TODAY (open versions run until then).
+    """
+    end_s = TODAY_END_S
+    from_s: List[int] = []
+    to_s: List[int] = []
+    span_s: List[int] = []
+    for v in versions:
+        lo = to_seconds(v["_from"])
+        hi = min(to_seconds(v["_to"]), end_s) if v["_to"] else end_s
+        from_s.append(lo)
+        to_s.append(hi)
+        span_s.append(hi - lo)
+    return from_s, to_s, span_s
+
+def sample_pairs(
+    n_participants: int,
+    from_s: List[int],
+    to_s: List[int],
+    span_s: List[int],
     n: int,
     withdraw_rate: float,
     allow_duplicates: bool,
-) -> List[Dict[str, Any]]:
-    if not participants or not versions:
+) -> List[Tuple[int, int, int, Optional[int]]]:
+    """
+    Integer-only sampling pass over participant/version indices.
+    Returns (participant_idx, version_idx, signed_s, withdrawn_s) per row;
+    ID and ISO formatting is left to the caller so it runs once per row.
+
+    Without duplicates, distinct (participant, version) cells are drawn directly with
+    random.sample, so nothing is rejected; the row count is capped at the number of cells.
+    """
+    # A window that closes before it opens can never yield a signing time
+    valid = [vi for vi, span in enumerate(span_s) if span >= 0]
+    if not valid or n_participants <= 0:
         return []
-    out: List[Dict[str, Any]] = []
-    used = set()  # (participant_id, consent_version_id)
-    attempts = 0
-    max_attempts = n * 10
-    while len(out) < n and attempts < max_attempts:
-        attempts += 1
-        pid = random.choice(participants)
-        v = random.choice(versions)
-        cvid = v["consent_version_id"]
-        if not allow_duplicates and (pid, cvid) in used:
-            continue
-        signed = pick_signed(v["_from"], v["_to"])
-        if not signed:
-            continue
-        out.append({
-            "participant_consent_id": str(uuid.uuid4()),
-            "participant_id": pid,
-            "consent_version_id": cvid,
-            "signedAt": signed.isoformat(timespec="seconds"),
-            "withdrawnAt": maybe_withdraw(signed, v["_to"], withdraw_rate),
-        })
-        used.add((pid, cvid))
+    n_valid = len(valid)
+    if allow_duplicates:
+        pis = random.choices(range(n_participants), k=n)
+        vis = random.choices(valid, k=n)
+    else:
+        cells = random.sample(range(n_participants * n_valid), min(n, n_participants * n_valid))
+        pis = [c // n_valid for c in cells]
+        vis = [valid[c % n_valid] for c in cells]
+
+    # Uniforms for signing/withdrawal are drawn as blocks too
+    k = len(pis)
+    rand = random.random
+    u = [rand() for _ in range(k)]
+    r1 = [rand() for _ in range(k)]
+    r2 = [rand() for _ in range(k)]
+    out: List[Tuple[int, int, int, Optional[int]]] = []
+    for i in range(k):
+        vi = vis[i]
+        signed = pick_signed(from_s[vi], span_s[vi], r1[i])
+        out.append((pis[i], vi, signed, maybe_withdraw(signed, to_s[vi], withdraw_rate, u[i], r2[i])))
     return out
 
+def iter_rows(
+    participants: List[str],
+    versions: List[Dict[str, Any]],
+    picks: List[Tuple[int, int, int, Optional[int]]],
+) -> Iterator[Tuple[str, str, str, str, str]]:
+    """
+    Yield output tuples for sampled picks one at a time, so the writer consumes them
+    as they are built; IDs are drawn per ID_BATCH rows rather than for the whole run.
+    """
+    for start in range(0, len(picks), ID_BATCH):
+        batch = picks[start:start + ID_BATCH]
+        for row_id, (pi, vi, signed, withdrawn) in zip(make_ids(len(batch)), batch):
+            yield (
+                row_id,
+                participants[pi],
+                versions[vi]["consent_version_id"],
+                iso_from_seconds(signed),
+                iso_from_seconds(withdrawn) if withdrawn is not None else "",
+            )
+
+def chunk_quotas(n: int, caps: List[int]) -> List[int]:
+    """
+    Split n rows across worker chunks as evenly as possible without giving a chunk more
+    than its cap (the distinct cells it holds); whatever a full chunk cannot take goes to the rest.
+    """
+    quotas = [0] * len(caps)
+    left = n
+    open_chunks = [i for i, cap in enumerate(caps) if cap > 0]
+    while left > 0 and open_chunks:
+        share, extra = divmod(left, len(open_chunks))
+        still_open = []
+        for j, i in enumerate(open_chunks):
+            take = min(share + (j < extra), caps[i] - quotas[i])
+            quotas[i] += take
+            left -= take
+            if quotas[i] < caps[i]:
+                still_open.append(i)
+        open_chunks = still_open
+    return quotas
+
+def generate_chunk(
+    task: Tuple[int, int, List[str], List[Dict[str, Any]], float, bool],
+) -> List[Tuple[str, str, str, str, str]]:
+    """
+    Worker entry point for --workers: rows for one participant partition under its own seed.
+    Partitions are disjoint, so the no-duplicate rule still holds across chunks.
+    """
+    seed, n, participants, versions, withdraw_rate, allow_duplicates = task
+    random.seed(seed)
+    from_s, to_s, span_s = version_windows(versions)
+    picks = sample_pairs(len(participants), from_s, to_s, span_s, n, withdraw_rate, allow_duplicates)
+    return list(iter_rows(participants, versions, picks))
+
 # ---------------------------
 # Main
 # ---------------------------
@@ -175,6 +310,7 @@ def main():
     parser.add_argument("--outfile", type=str, default="ParticipantConsents.csv", help="Output CSV path (or .json)")
     parser.add_argument("--json", dest="json_out", action="store_true", help="Write JSON instead of CSV")
     parser.add_argument("--seed", type=int, default=1337, help="Random seed")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1; output for a seed depends on this)")
     args = parser.parse_args()
 
     random.seed(args.seed)
@@ -186,19 +322,49 @@ def main():
     if not versions:
         raise ValueError("No consent versions found (or all are future-only).")
 
-    rows = make_rows(participants, versions, args.n, args.withdraw_rate, args.allow_duplicates)
+    # Distinct-cell sampling needs one slot per participant id and per consent_version_id;
+    # repeated consent_version_ids collapse onto the first row carrying them
+    participants = list(dict.fromkeys(participants))
+    first_row: Dict[str, Dict[str, Any]] = {}
+    for v in versions:
+        first_row.setdefault(v["consent_version_id"], v)
+    versions = list(first_row.values())
+    from_s, to_s, span_s = version_windows(versions)
+    if args.workers > 1:
+        # Split participants (and n) across processes; chunk i is seeded with seed ^ i
+        k = args.workers
+        parts_in = [participants[i::k] for i in range(k)]
+        if args.allow_duplicates:
+            caps = [args.n if part else 0 for part in parts_in]
+        else:
+            # A chunk holds only len(part) * (versions with a usable window) distinct cells
+            n_valid = sum(1 for span in span_s if span >= 0)
+            caps = [len(part) * n_valid for part in parts_in]
+        quotas = chunk_quotas(args.n, caps)
+        tasks = [
+            (args.seed ^ i, quotas[i], parts_in[i],
+             versions, args.withdraw_rate, args.allow_duplicates)
+            for i in range(k)
+        ]
+        with ProcessPoolExecutor(max_workers=k) as ex:
+            parts = list(ex.map(generate_chunk, tasks))
+        n_rows = sum(len(part) for part in parts)
+        rows = itertools.chain.from_iterable(parts)
+    else:
+        picks = sample_pairs(len(participants), from_s, to_s, span_s, args.n, args.withdraw_rate, args.allow_duplicates)
+        n_rows = len(picks)
+        rows = iter_rows(participants, versions, picks)
 
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "ParticipantConsents.json"
-        Path(out).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f"Wrote {len(rows)} ParticipantConsent rows to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {n_rows} ParticipantConsent rows to JSON: {out}")
     else:
-        fieldnames = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
-        print(f"Wrote {len(rows)} ParticipantConsent rows to CSV: {args.outfile}")
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            w.writerows(rows)  # streamed: rows are formatted as the writer pulls them
+        print(f"Wrote {n_rows} ParticipantConsent rows to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     try:
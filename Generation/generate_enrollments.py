@@ -22,8 +22,13 @@ Usage examples:
 
 import argparse
 import csv
+import functools
+import hashlib
+import itertools
 import json
+import os
 import random
+import time
 import uuid
 from datetime import date, datetime, timedelta
 from pathlib import Path
@@ -33,6 +38,12 @@ from typing import Any, Dict, List, Optional, Tuple
 # Config
 # ---------------------------
 TODAY = date(2025, 9, 21)  # stable for reproducibility
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+
+# Day bounds, computed once (datetimes and EPOCH seconds)
+TODAY_START = datetime.combine(TODAY, datetime.min.time())
+TODAY_END = TODAY_START + timedelta(hours=23, minutes=59, seconds=59)
+TODAY_END_S = int((TODAY_END - EPOCH).total_seconds())
 
 # How far before a session enrollments can start appearing
 ENROLL_OPEN_DAYS = 90
@@ -55,6 +66,21 @@ STATUS_WEIGHTS_PAST = {
     "waitlisted": 0.00,
 }
 
+# Labels + cumulative weights unpacked once, so each draw skips the dict/zip/accumulate work
+STATUS_LABELS_FUTURE = tuple(STATUS_WEIGHTS_FUTURE)
+STATUS_CUM_WEIGHTS_FUTURE = tuple(itertools.accumulate(STATUS_WEIGHTS_FUTURE.values()))
+STATUS_LABELS_PAST = tuple(STATUS_WEIGHTS_PAST)
+STATUS_CUM_WEIGHTS_PAST = tuple(itertools.accumulate(STATUS_WEIGHTS_PAST.values()))
+
+# SHA-1 state after the NAMESPACE_URL prefix; uuid5 ids copy it instead of rehashing the namespace
+NAMESPACE_URL_SHA1 = hashlib.sha1(uuid.NAMESPACE_URL.bytes)
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["participant_id","session_id","status","created_at","updated_at"]
+
 # If no sessions/participants files, fallback pool sizes
 FALLBACK_PARTICIPANTS = 1200
 FALLBACK_SESSIONS = 400
@@ -62,6 +88,7 @@ FALLBACK_SESSIONS = 400
 # ---------------------------
 # Helpers
 # ---------------------------
+@functools.lru_cache(maxsize=None)  # sessions land on shared 15-minute slots, so startTs/endTs repeat
 def parse_dt(s: str) -> Optional[datetime]:
     s = (s or "").strip()
     if not s:
@@ -76,29 +103,58 @@ def parse_dt(s: str) -> Optional[datetime]:
     except Exception:
         return None
 
-def today_start() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time())
-
-def today_end() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=23, minutes=59, seconds=59)
-
 def iso(dt: datetime) -> str:
     return dt.isoformat(timespec="seconds")
 
+def to_seconds(dt: datetime) -> int:
+    return int((dt - EPOCH).total_seconds())
+
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+
+def uuid5_url(name: str) -> str:
+    """Same string as str(uuid.uuid5(uuid.NAMESPACE_URL, name)), without building a UUID object."""
+    h = NAMESPACE_URL_SHA1.copy()
+    h.update(name.encode("utf-8"))
+    d = h.hexdigest()
+    # version nibble 5 and variant bits 10xx (RFC 4122), as uuid.uuid5 sets them
+    return f"{d[:8]}-{d[8:12]}-5{d[13:16]}-{'89ab'[int(d[16], 16) & 3]}{d[17:20]}-{d[20:32]}"
+
 def uuid5_for_session(study_id: str, room_id: str, start_ts: str) -> str:
     basis = f"{(study_id or '').strip()}::{(room_id or '').strip()}::{(start_ts or '').strip()}"
-    return str(uuid.uuid5(uuid.NAMESPACE_URL, basis))
+    return uuid5_url(basis)
 
-def rand_dt_between(a: datetime, b: datetime) -> datetime:
+def rand_s_between(a: int, b: int) -> int:
     if b < a:
         a, b = b, a
-    delta = int((b - a).total_seconds())
-    return a + timedelta(seconds=random.randint(0, max(0, delta)))
-
-def pick_weighted(weights: Dict[str, float]) -> str:
-    items = list(weights.items())
-    labels, probs = zip(*items)
-    return random.choices(labels, weights=probs, k=1)[0]
+    return a + random.randint(0, b - a)
+
+def pick_weighted(labels: Tuple[str, ...], cum_weights: Tuple[float, ...]) -> str:
+    return random.choices(labels, cum_weights=cum_weights, k=1)[0]
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
 # Readers (optional local files)
@@ -114,12 +170,14 @@ def read_participant_ids(path: Path) -> List[str]:
             key = "participant_id" if "participant_id" in data[0] else "id"
             return [row[key] for row in data if row.get(key)]
         return [str(x) for x in data]
-    with path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if not reader.fieldnames or ("participant_id" not in reader.fieldnames and "id" not in reader.fieldnames):
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Plain csv.reader + one column index: no per-row dict, and only the id column is kept
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or ("participant_id" not in header and "id" not in header):
             return []
-        key = "participant_id" if "participant_id" in reader.fieldnames else "id"
-        return [row[key] for row in reader if row.get(key)]
+        i = header.index("participant_id" if "participant_id" in header else "id")
+        return [row[i] for row in reader if len(row) > i and row[i]]
 
 def read_sessions(path: Path) -> List[Dict[str, Any]]:
     """
@@ -143,94 +201,153 @@ def read_sessions(path: Path) -> List[Dict[str, Any]]:
                 "capacity": int(cap) if isinstance(cap, int) or (isinstance(cap, str) and cap.isdigit()) else None,
             })
         return rows
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        has_session_id = r.fieldnames and "session_id" in r.fieldnames
+    with path.open("r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        header = next(r, None) or []
+        # Column positions resolved once from the header; absent columns map to None
+        idx = {name: i for i, name in enumerate(header)}
+        sid_i = idx.get("session_id")
+        study_i = idx.get("study_id")
+        room_i = idx.get("room_id")
+        start_i = idx.get("startTs")
+        end_i = idx.get("endTs")
+        cap_i = idx.get("capacity")
+        width = len(header)
         for row in r:
-            sid = row.get("session_id") if has_session_id else uuid5_for_session(row.get("study_id",""), row.get("room_id",""), row.get("startTs",""))
+            if not row:
+                continue
+            if len(row) < width:
+                row += [None] * (width - len(row))  # short rows read as missing, like DictReader
+            start_ts = row[start_i] if start_i is not None else None
+            if sid_i is not None:
+                sid = row[sid_i]
+            else:
+                sid = uuid5_for_session(
+                    row[study_i] if study_i is not None else "",
+                    row[room_i] if room_i is not None else "",
+                    start_ts or "",
+                )
             cap = None
-            if "capacity" in (r.fieldnames or []):
+            if cap_i is not None:
                 try:
-                    cap = int(row["capacity"])
+                    cap = int(row[cap_i])
                 except Exception:
                     cap = None
             rows.append({
                 "session_id": sid,
-                "startTs": row.get("startTs"),
-                "endTs": row.get("endTs"),
+                "startTs": start_ts,
+                "endTs": row[end_i] if end_i is not None else None,
                 "capacity": cap,
             })
     return rows
 
+def session_columns(sessions: List[Dict[str, Any]]) -> Tuple[List[str], List[int], List[int], List[Optional[int]]]:
+    """
+    Split sessions into parallel (session_id, start_s, end_s, capacity) lists so that
+    startTs/endTs are parsed once per session instead of once per sampling attempt.
+    Missing start defaults to a week from TODAY; missing end to start + 1 hour.
+    """
+    default_start = to_seconds(TODAY_START + timedelta(days=7))
+    ids: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    caps: List[Optional[int]] = []
+    for sess in sessions:
+        start_dt = parse_dt(sess.get("startTs", ""))
+        end_dt = parse_dt(sess.get("endTs", ""))
+        start = to_seconds(start_dt) if start_dt else default_start
+        ids.append(sess["session_id"])
+        starts.append(start)
+        ends.append(to_seconds(end_dt) if end_dt else start + 3600)
+        caps.append(sess.get("capacity"))
+    return ids, starts, ends, caps
+
+def enroll_windows(starts: List[int]) -> Tuple[List[int], List[int]]:
+    """
+    Per-session (open_from, open_to) bounds for created_at, in epoch seconds, computed once
+    instead of per row: open from ENROLL_OPEN_DAYS before start until an hour before start
+    (or now). Windows that close before they open fall back to the day before start - 30 min.
+    """
+    now = TODAY_END_S
+    open_from: List[int] = []
+    open_to: List[int] = []
+    for start in starts:
+        lo = start - ENROLL_OPEN_DAYS * 86400
+        hi = min(start - 3600, now)
+        if hi <= lo:
+            hi = start - 30 * 60
+            lo = hi - 86400
+        open_from.append(lo)
+        open_to.append(hi)
+    return open_from, open_to
+
 # ---------------------------
 # Row factory
 # ---------------------------
 def build_enrollment_for(
     participant_id: str,
-    sess: Dict[str, Any],
-    used_pairs: set,
-    session_used: Dict[str, int],
-) -> Optional[Dict[str, Any]]:
-    session_id = sess["session_id"]
-    if (participant_id, session_id) in used_pairs:
-        return None
-
-    start = parse_dt(sess.get("startTs", "")) or today_start() + timedelta(days=7)
-    end = parse_dt(sess.get("endTs", "")) or (start + timedelta(hours=1))
-    now = today_end()
+    session_id: str,
+    start: int,
+    end: int,
+    cap: Optional[int],
+    open_from: int,
+    open_to: int,
+    slot: int,
+    session_used: List[int],
+) -> Tuple[str, str, str, str, str]:
+    """
+    start/end are session bounds in epoch seconds (see session_columns);
+    open_from/open_to bound created_at (see enroll_windows).
+    slot is the session's integer index into session_used (seats taken so far).
+    The caller is responsible for skipping (participant, session) pairs already used.
+    """
+    now = TODAY_END_S
 
     # Determine if seat available
-    cap = sess.get("capacity")
-    taken = session_used.get(session_id, 0)
+    taken = session_used[slot]
     seat_available = (cap is None) or (taken < max(0, cap))
 
     # Choose status based on timing and seat
     if seat_available:
         if end <= now:  # session in the past
-            status = pick_weighted(STATUS_WEIGHTS_PAST)
+            status = pick_weighted(STATUS_LABELS_PAST, STATUS_CUM_WEIGHTS_PAST)
         else:
-            status = pick_weighted(STATUS_WEIGHTS_FUTURE)
+            status = pick_weighted(STATUS_LABELS_FUTURE, STATUS_CUM_WEIGHTS_FUTURE)
     else:
         status = "waitlisted"
 
     # created_at before session start (or before now if start in past)
-    open_from = start - timedelta(days=ENROLL_OPEN_DAYS)
-    open_to = min(start - timedelta(hours=1), now)
-    if open_to <= open_from:
-        open_to = start - timedelta(minutes=30)
-        open_from = open_to - timedelta(days=1)
-    created_at = rand_dt_between(open_from, open_to)
+    created_at = rand_s_between(open_from, open_to)
 
     # updated_at depends on status
     if status == "cancelled":
         # cancel between created and (start - 10 min) or now
-        last = min(start - timedelta(minutes=10), now)
+        last = min(start - 10 * 60, now)
         if last <= created_at:
-            last = created_at + timedelta(minutes=5)
-        updated_at = rand_dt_between(created_at + timedelta(minutes=1), last)
+            last = created_at + 5 * 60
+        updated_at = rand_s_between(created_at + 60, last)
     elif status in ("attended", "no_show"):
         # update shortly after session end (if in the past)
         base = end if end <= now else start
-        updated_at = rand_dt_between(base, min(base + timedelta(hours=3), now))
+        updated_at = rand_s_between(base, min(base + 3 * 3600, now))
     else:
         # enrolled/waitlisted: updated sometime after created, but not past now/start
         last = min(now, start)
         if last <= created_at:
-            last = created_at + timedelta(minutes=5)
-        updated_at = rand_dt_between(created_at, last)
+            last = created_at + 5 * 60
+        updated_at = rand_s_between(created_at, last)
 
     # Count seat usage if it occupies capacity
     if seat_available and status in ("enrolled", "attended", "no_show"):
-        session_used[session_id] = taken + 1
+        session_used[slot] = taken + 1
 
-    used_pairs.add((participant_id, session_id))
-    return {
-        "participant_id": participant_id,
-        "session_id": session_id,
-        "status": status,
-        "created_at": iso(created_at),
-        "updated_at": iso(updated_at),
-    }
+    return (
+        participant_id,
+        session_id,
+        status,
+        iso_from_seconds(created_at),
+        iso_from_seconds(updated_at),
+    )
 
 # ---------------------------
 # Main
@@ -255,52 +372,59 @@ def main():
     # Load participants
     participants = read_participant_ids(Path(args.participants_file))
     if not participants:
-        participants = [str(uuid.uuid4()) for _ in range(args.participant_pool)]
+        participants = make_ids(args.participant_pool)
 
     # Load sessions
     sessions = read_sessions(Path(args.sessions_file))
     if not sessions:
         # synthesize sessions (without times, but give a plausible spread)
         sessions = []
-        base = today_start()
-        for i in range(args.session_pool):
+        base = TODAY_START
+        for sid in make_ids(args.session_pool):
             start = base + timedelta(days=random.randint(-10, 60), hours=random.randint(8, 19), minutes=random.choice([0, 15, 30, 45]))
             end = start + timedelta(minutes=random.randint(45, 120))
             sessions.append({
-                "session_id": str(uuid.uuid4()),
+                "session_id": sid,
                 "startTs": iso(start),
                 "endTs": iso(end),
                 "capacity": random.randint(18, 60),
             })
 
     # Build enrollments
-    used_pairs: set = set()
-    session_used: Dict[str, int] = {}
-    rows: List[Dict[str, Any]] = []
-
-    attempts = 0
-    max_attempts = args.n * 15
-    while len(rows) < args.n and attempts < max_attempts:
-        attempts += 1
-        pid = random.choice(participants)
-        sess = random.choice(sessions)
-        row = build_enrollment_for(pid, sess, used_pairs, session_used)
-        if row:
-            rows.append(row)
+    participants = list(dict.fromkeys(participants))  # one index per participant id
+    sess_ids, sess_start, sess_end, sess_cap = session_columns(sessions)
+    sess_open_from, sess_open_to = enroll_windows(sess_start)
+    # Repeated session_ids collapse onto the first row carrying them
+    first_row: Dict[str, int] = {}
+    for i, sid in enumerate(sess_ids):
+        first_row.setdefault(sid, i)
+    slots = list(first_row.values())
+    n_slots = len(slots)
+    session_used = [0] * len(sessions)  # seats taken, indexed by session slot
+
+    # Draw distinct (participant, session) cells directly instead of rejecting repeats;
+    # the row count is capped at the number of distinct pairs
+    cells = random.sample(range(len(participants) * n_slots), min(args.n, len(participants) * n_slots))
+    # Lazy: each row is built (and its seat counted) as the writer pulls it, in cell order
+    rows = (
+        build_enrollment_for(
+            participants[pi], sess_ids[si], sess_start[si], sess_end[si], sess_cap[si],
+            sess_open_from[si], sess_open_to[si], si, session_used,
+        )
+        for pi, si in ((c // n_slots, slots[c % n_slots]) for c in cells)
+    )
 
     # Write out
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "enrollments.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} enrollments to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {len(cells)} enrollments to JSON: {out}")
     else:
-        fieldnames = ["participant_id","session_id","status","created_at","updated_at"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
-        print(f"Wrote {len(rows)} enrollments to CSV: {args.outfile}")
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            w.writerows(rows)  # streamed: rows are formatted as the writer pulls them
+        print(f"Wrote {len(cells)} enrollments to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
@@ -16,10 +16,14 @@ Usage examples:
 
 import argparse
 import csv
+import itertools
 import json
+import os
 import random
-import uuid
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
 
 # ---------------------------
 # Config
@@ -27,46 +31,162 @@ from datetime import date, datetime, timedelta
 TODAY = date(2025, 9, 21)             # keep dates stable for reproducibility
 SIGNED_WINDOW_DAYS = 540              # how far back signedAt can be
 WITHDRAW_MAX_DAYS_AFTER_SIGN = 240    # max days after signedAt for withdrawnAt
+EPOCH = datetime(1970, 1, 1)          # naive epoch for integer-second timestamp arithmetic
+
+# Day bounds, computed once (datetimes and EPOCH seconds)
+TODAY_START = datetime.combine(TODAY, datetime.min.time())
+TODAY_END = TODAY_START + timedelta(hours=23, minutes=59, seconds=59)
+TODAY_END_S = int((TODAY_END - EPOCH).total_seconds())
+SIGNED_FROM_S = int((TODAY_START - timedelta(days=SIGNED_WINDOW_DAYS) - EPOCH).total_seconds())
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Rows formatted per os.urandom read while streaming output
+ID_BATCH = 4096
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
 
 # ---------------------------
 # Helpers
 # ---------------------------
-def today_start() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time())
-
-def today_end() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=23, minutes=59, seconds=59)
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
 
-def rand_dt_between(a: datetime, b: datetime) -> datetime:
+def seconds_at_fraction(a: int, b: int, r: float) -> int:
+    """Place an epoch-seconds timestamp between a and b using a pre-drawn uniform r in [0, 1)."""
     if b < a:
         a, b = b, a
-    delta = int((b - a).total_seconds())
-    return a + timedelta(seconds=random.randint(0, max(0, delta)))
-
-def make_id() -> str:
-    return str(uuid.uuid4())
+    return a + int(r * (b - a + 1))
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
-# Row factory
+# Sampling
 # ---------------------------
-def make_participant_consent_row(pid: str, cvid: str, withdraw_rate: float) -> dict:
+def pick_times(withdraw_rate: float, u: float, r1: float, r2: float) -> Tuple[int, Optional[int]]:
     # signed within the last SIGNED_WINDOW_DAYS
-    signed_at = rand_dt_between(today_start() - timedelta(days=SIGNED_WINDOW_DAYS), today_end())
+    signed_s = seconds_at_fraction(SIGNED_FROM_S, TODAY_END_S, r1)
 
     # maybe produce a withdrawnAt after signedAt (and not in the future)
-    withdrawn_at = ""
-    if random.random() < withdraw_rate:
-        latest = min(signed_at + timedelta(days=WITHDRAW_MAX_DAYS_AFTER_SIGN), today_end())
-        if latest > signed_at:
-            withdrawn_at = rand_dt_between(signed_at + timedelta(minutes=1), latest).isoformat(timespec="seconds")
-
-    return {
-        "participant_consent_id": make_id(),
-        "participant_id": pid,
-        "consent_version_id": cvid,
-        "signedAt": signed_at.isoformat(timespec="seconds"),
-        "withdrawnAt": withdrawn_at,
-    }
+    withdrawn_s = None
+    if u < withdraw_rate:
+        latest = min(signed_s + WITHDRAW_MAX_DAYS_AFTER_SIGN * 86400, TODAY_END_S)
+        if latest > signed_s:
+            withdrawn_s = seconds_at_fraction(signed_s + 60, latest, r2)
+    return signed_s, withdrawn_s
+
+def sample_pairs(
+    n_participants: int,
+    n_versions: int,
+    n: int,
+    withdraw_rate: float,
+    allow_duplicates: bool,
+) -> List[Tuple[int, int, int, Optional[int]]]:
+    """
+    Integer-only sampling pass over participant/version indices.
+    Returns (participant_idx, version_idx, signed_s, withdrawn_s) per row.
+
+    Without duplicates, distinct (participant, version) cells are drawn directly with
+    random.sample, so nothing is rejected; the row count is capped at the number of cells.
+    """
+    if n_participants <= 0 or n_versions <= 0:
+        return []
+    if allow_duplicates:
+        pis = random.choices(range(n_participants), k=n)
+        vis = random.choices(range(n_versions), k=n)
+    else:
+        cells = random.sample(range(n_participants * n_versions), min(n, n_participants * n_versions))
+        pis = [c // n_versions for c in cells]
+        vis = [c % n_versions for c in cells]
+
+    # Uniforms for signing/withdrawal are drawn as blocks too
+    k = len(pis)
+    rand = random.random
+    u = [rand() for _ in range(k)]
+    r1 = [rand() for _ in range(k)]
+    r2 = [rand() for _ in range(k)]
+    out: List[Tuple[int, int, int, Optional[int]]] = []
+    for i in range(k):
+        signed_s, withdrawn_s = pick_times(withdraw_rate, u[i], r1[i], r2[i])
+        out.append((pis[i], vis[i], signed_s, withdrawn_s))
+    return out
+
+# ---------------------------
+# Row factory
+# ---------------------------
+def make_participant_consent_row(row_id: str, pid: str, cvid: str, signed_s: int, withdrawn_s: Optional[int]) -> tuple:
+    return (
+        row_id,
+        pid,
+        cvid,
+        iso_from_seconds(signed_s),
+        iso_from_seconds(withdrawn_s) if withdrawn_s is not None else "",
+    )
+
+def iter_rows(
+    participant_ids: List[str],
+    consent_version_ids: List[str],
+    picks: List[Tuple[int, int, int, Optional[int]]],
+) -> Iterator[tuple]:
+    """Yield rows one at a time for the writer; row IDs are drawn per ID_BATCH picks."""
+    for start in range(0, len(picks), ID_BATCH):
+        batch = picks[start:start + ID_BATCH]
+        for row_id, (pi, vi, signed_s, withdrawn_s) in zip(make_ids(len(batch)), batch):
+            yield make_participant_consent_row(row_id, participant_ids[pi], consent_version_ids[vi], signed_s, withdrawn_s)
+
+def chunk_quotas(n: int, caps: List[int]) -> List[int]:
+    """
+    Split n rows across worker chunks as evenly as possible without giving a chunk more
+    than its cap (the distinct cells it holds); whatever a full chunk cannot take goes to the rest.
+    """
+    quotas = [0] * len(caps)
+    left = n
+    open_chunks = [i for i, cap in enumerate(caps) if cap > 0]
+    while left > 0 and open_chunks:
+        share, extra = divmod(left, len(open_chunks))
+        still_open = []
+        for j, i in enumerate(open_chunks):
+            take = min(share + (j < extra), caps[i] - quotas[i])
+            quotas[i] += take
+            left -= take
+            if quotas[i] < caps[i]:
+                still_open.append(i)
+        open_chunks = still_open
+    return quotas
+
+def generate_chunk(task: Tuple[int, int, List[str], List[str], float, bool]) -> List[tuple]:
+    """
+    Worker entry point for --workers: rows for one participant partition under its own seed.
+    Partitions are disjoint, so the no-duplicate rule still holds across chunks.
+    """
+    seed, n, participant_ids, consent_version_ids, withdraw_rate, allow_duplicates = task
+    random.seed(seed)
+    picks = sample_pairs(len(participant_ids), len(consent_version_ids), n, withdraw_rate, allow_duplicates)
+    return list(iter_rows(participant_ids, consent_version_ids, picks))
 
 # ---------------------------
 # Main
@@ -81,45 +201,51 @@ def main():
     parser.add_argument("--outfile", type=str, default="ParticipantConsents.csv", help="Output file path")
     parser.add_argument("--json", dest="json_out", action="store_true", help="Write JSON instead of CSV")
     parser.add_argument("--seed", type=int, default=1337, help="Random seed for reproducibility")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1; output for a seed depends on this)")
     args = parser.parse_args()
 
     random.seed(args.seed)
 
     # Make ID pools
-    participant_ids = [make_id() for _ in range(args.participants)]
-    consent_version_ids = [make_id() for _ in range(args.versions)]
-
-    rows = []
-    used_pairs = set()
-    attempts = 0
-    max_attempts = args.n * 10  # safety to avoid infinite loops if not allowing duplicates
-
-    while len(rows) < args.n and attempts < max_attempts:
-        attempts += 1
-        pid = random.choice(participant_ids)
-        cvid = random.choice(consent_version_ids)
-        pair = (pid, cvid)
-
-        if not args.allow_duplicates and pair in used_pairs:
-            continue
-
-        row = make_participant_consent_row(pid, cvid, args.withdraw_rate)
-        rows.append(row)
-        used_pairs.add(pair)
+    participant_ids = make_ids(args.participants)
+    consent_version_ids = make_ids(args.versions)
+
+    if args.workers > 1:
+        # Split participants (and n) across processes; chunk i is seeded with seed ^ i
+        k = args.workers
+        parts_in = [participant_ids[i::k] for i in range(k)]
+        if args.allow_duplicates:
+            caps = [args.n if part else 0 for part in parts_in]
+        else:
+            # A chunk holds only len(part) * versions distinct cells
+            caps = [len(part) * len(consent_version_ids) for part in parts_in]
+        quotas = chunk_quotas(args.n, caps)
+        tasks = [
+            (args.seed ^ i, quotas[i], parts_in[i],
+             consent_version_ids, args.withdraw_rate, args.allow_duplicates)
+            for i in range(k)
+        ]
+        with ProcessPoolExecutor(max_workers=k) as ex:
+            parts = list(ex.map(generate_chunk, tasks))
+        n_rows = sum(len(part) for part in parts)
+        rows = itertools.chain.from_iterable(parts)
+    else:
+        # Sample on indices first; IDs and ISO strings are only built for accepted rows
+        picks = sample_pairs(len(participant_ids), len(consent_version_ids), args.n, args.withdraw_rate, args.allow_duplicates)
+        n_rows = len(picks)
+        rows = iter_rows(participant_ids, consent_version_ids, picks)
 
     # Write output
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "ParticipantConsents.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} ParticipantConsent rows to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {n_rows} ParticipantConsent rows to JSON: {out}")
     else:
-        fieldnames = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
-        print(f"Wrote {len(rows)} ParticipantConsent rows to CSV: {args.outfile}")
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            w.writerows(rows)  # streamed: rows are formatted as the writer pulls them
+        print(f"Wrote {n_rows} ParticipantConsent rows to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
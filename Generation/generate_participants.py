@@ -11,12 +11,18 @@ Usage:
 
 import argparse
 import csv
+import functools
+import itertools
 import json
+import os
 import random
+import re
 import string
 import sys
-import uuid
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timedelta
+from typing import Iterator, List, Tuple
 
 # ---------------------------
 # Configurable vocabularies
@@ -44,45 +50,68 @@ ETHNICITIES = [
 ]
 STATUSES = ["active","paused","ineligible","banned"]
 PAYLOAD_STATUS_WEIGHTS = [0.78, 0.12, 0.08, 0.02]  # realistic distribution
+PAYLOAD_STATUS_CUM_WEIGHTS = tuple(itertools.accumulate(PAYLOAD_STATUS_WEIGHTS))  # accumulated once
 EMAIL_DOMAINS = ["example.edu","university.edu","mail.edu","campus.edu"]
+BIO_TEMPLATES = [
+    "Interested in {major}, research participation, and campus volunteering.",
+    "Enjoys intramural sports, hackathons, and learning more about {major}.",
+    "Looking to gain exposure to human subjects research related to {major}.",
+    "Works part-time, balances coursework in {major} with community projects.",
+    "Exploring career paths that connect {major} with real-world impact."
+]
+# Every (major, template) bio formatted once up front
+BIOS = {major: tuple(t.format(major=major) for t in BIO_TEMPLATES) for major in MAJORS}
 
 # Academic year range for undergrads; adjust if needed
 CLASS_YEARS = list(range(2025, 2031))
 
 TODAY = date(2025, 9, 21)  # keep dates stable for reproducibility
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+TODAY_START_S = int((datetime.combine(TODAY, datetime.min.time()) - EPOCH).total_seconds())
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = [
+    "participant_id","first_name","last_name","email","phone","date_of_birth","age","gender",
+    "ethnicity","major","class_year","gpa","status","bio","created_at","updated_at"
+]
 
 # ---------------------------
 # Helpers
 # ---------------------------
+# Each non-alphanumeric character becomes "-" (the name vocabularies are ASCII)
+SLUG_NON_ALNUM = re.compile("[^a-z0-9]")
+
 def slugify(s: str) -> str:
-    s = s.lower()
-    return "".join(ch if ch.isalnum() else "-" for ch in s).strip("-")
+    return SLUG_NON_ALNUM.sub("-", s.lower()).strip("-")
 
 def random_phone() -> str:
-    # Simple US-style phone; avoids NANP invalids like 0/1 starts
-    def block(n, allow_leading_zero=False):
-        first = random.randint(2 if not allow_leading_zero else 0, 9)
-        rest = "".join(str(random.randint(0,9)) for _ in range(n-1))
-        return f"{first}{rest}"
-    return f"{block(3)}-{block(3)}-{''.join(str(random.randint(0,9)) for _ in range(4))}"
+    # Simple US-style phone; avoids NANP invalids like 0/1 starts.
+    # Area code and exchange are drawn whole from 200..999 (first digit 2-9, the rest 0-9),
+    # the line number from 0..9999, and the three are formatted in one operation.
+    return "%d-%d-%04d" % (random.randrange(200, 1000), random.randrange(200, 1000), random.randrange(10000))
 
-def random_dob_age(min_age=18, max_age=65):
-    age = random.randint(min_age, max_age)
-    # Random birthday within that age
+@functools.lru_cache(maxsize=None)
+def dob_window(age: int) -> Tuple[int, int]:
+    """(first day ordinal, span in days) of possible birthdays for age; computed once per age."""
     start = TODAY.replace(year=TODAY.year - age) - timedelta(days=365)
     end = TODAY.replace(year=TODAY.year - (age - 1))
     # Clamp for leap years and ordering
     if start > end:
         start, end = end, start
-    delta_days = (end - start).days
-    dob = start + timedelta(days=random.randint(0, max(delta_days, 0)))
+    return start.toordinal(), max((end - start).days, 0)
+
+def random_dob_age(min_age=18, max_age=65):
+    age = random.randint(min_age, max_age)
+    # Random birthday within that age, as a day offset into the cached window
+    first, span = dob_window(age)
+    dob = date.fromordinal(first + random.randint(0, span))
     # Recompute age precisely
     computed_age = TODAY.year - dob.year - ((TODAY.month, TODAY.day) < (dob.month, dob.day))
     return dob, computed_age
 
-def weighted_choice(options, weights):
-    return random.choices(options, weights=weights, k=1)[0]
-
 def random_gpa(min_gpa=2.0, max_gpa=4.0):
     # Beta distribution to cluster around 3.2–3.6
     g = random.betavariate(6, 3)  # skew high
@@ -90,14 +119,7 @@ def random_gpa(min_gpa=2.0, max_gpa=4.0):
     return round(val, 2)
 
 def random_bio(major):
-    templates = [
-        "Interested in {major}, research participation, and campus volunteering.",
-        "Enjoys intramural sports, hackathons, and learning more about {major}.",
-        "Looking to gain exposure to human subjects research related to {major}.",
-        "Works part-time, balances coursework in {major} with community projects.",
-        "Exploring career paths that connect {major} with real-world impact."
-    ]
-    return random.choice(templates).format(major=major)
+    return random.choice(BIOS[major])
 
 def make_email(first, last):
     handle_variants = [
@@ -110,53 +132,91 @@ def make_email(first, last):
     domain = random.choice(EMAIL_DOMAINS)
     return f"{handle}@{domain}"
 
-def rand_ts_between(days_back=180):
-    # Random timestamp within last N days
-    seconds_back = random.randint(0, days_back * 24 * 3600)
-    dt = datetime.combine(TODAY, datetime.min.time()) + timedelta(seconds=seconds_back)
-    return dt.isoformat()
+def rand_ts_between(days_back=180) -> int:
+    # Random timestamp within last N days, as EPOCH seconds
+    return TODAY_START_S + random.randint(0, days_back * 24 * 3600)
+
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
 # Row factory
 # ---------------------------
-def make_participant_row(i: int):
-    pid = str(uuid.uuid4())
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
-    email = make_email(first, last)
-    phone = random_phone()
-    gender = random.choice(GENDERS)
-    ethnicity = random.choice(ETHNICITIES)
-    major = random.choice(MAJORS)
-    class_year = random.choice(CLASS_YEARS)
-
-    dob, age = random_dob_age(18, 65)
-    gpa = random_gpa(2.0, 4.0)
-    status = weighted_choice(STATUSES, PAYLOAD_STATUS_WEIGHTS)
-
-    created_at = rand_ts_between(365)
-    # updated_at at or after created_at
-    updated_at = datetime.fromisoformat(created_at) + timedelta(days=random.randint(0, 120), seconds=random.randint(0, 86400))
-    bio = random_bio(major)
-
-    return {
-        "participant_id": pid,
-        "first_name": first,
-        "last_name": last,
-        "email": email,
-        "phone": phone,
-        "date_of_birth": dob.isoformat(),
-        "age": age,
-        "gender": gender,
-        "ethnicity": ethnicity,
-        "major": major,
-        "class_year": class_year,
-        "gpa": gpa,
-        "status": status,
-        "bio": bio,
-        "created_at": created_at,
-        "updated_at": updated_at.isoformat(timespec="seconds"),
-    }
+def iter_participants(n: int) -> Iterator[tuple]:
+    """
+    Yield n participant rows (tuples in FIELDNAMES order). Each categorical field is drawn
+    for every row up front in a single random.choices(..., k=n) call; the dependent fields
+    are built one row at a time as the writer pulls them.
+    """
+    firsts = random.choices(FIRST_NAMES, k=n)
+    lasts = random.choices(LAST_NAMES, k=n)
+    genders = random.choices(GENDERS, k=n)
+    ethnicities = random.choices(ETHNICITIES, k=n)
+    majors = random.choices(MAJORS, k=n)
+    class_years = random.choices(CLASS_YEARS, k=n)
+    statuses = random.choices(STATUSES, cum_weights=PAYLOAD_STATUS_CUM_WEIGHTS, k=n)
+    gpas = [random_gpa(2.0, 4.0) for _ in range(n)]
+    pids = make_ids(n)
+
+    # Bound once: the per-row loop skips the module/global lookups
+    randint = random.randint
+    iso = iso_from_seconds
+    for pid, first, last, gender, ethnicity, major, class_year, status, gpa in zip(
+        pids, firsts, lasts, genders, ethnicities, majors, class_years, statuses, gpas
+    ):
+        dob, age = random_dob_age(18, 65)
+        created_s = rand_ts_between(365)
+        # updated_at at or after created_at
+        updated_s = created_s + randint(0, 120) * 86400 + randint(0, 86400)
+
+        yield (
+            pid,
+            first,
+            last,
+            make_email(first, last),
+            random_phone(),
+            dob.isoformat(),
+            age,
+            gender,
+            ethnicity,
+            major,
+            class_year,
+            gpa,
+            status,
+            random_bio(major),
+            iso(created_s),
+            iso(updated_s),
+        )
+
+def generate_chunk(task: Tuple[int, int]) -> List[tuple]:
+    """Worker entry point for --workers: n participant rows under the chunk's own seed."""
+    seed, n = task
+    random.seed(seed)
+    return list(iter_participants(n))
 
 # ---------------------------
 # Main
@@ -167,23 +227,29 @@ def main():
     parser.add_argument("--outfile", type=str, default="participants.csv", help="Output file path")
     parser.add_argument("--json", dest="json_out", action="store_true", help="Write JSON instead of CSV")
     parser.add_argument("--seed", type=int, default=1337, help="Random seed for reproducibility")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1; output for a seed depends on this)")
     args = parser.parse_args()
 
     random.seed(args.seed)
 
-    rows = [make_participant_row(i) for i in range(args.n)]
+    if args.workers > 1:
+        # Split n across processes; chunk i is seeded with seed ^ i
+        k = args.workers
+        tasks = [(args.seed ^ i, args.n // k + (i < args.n % k)) for i in range(k)]
+        with ProcessPoolExecutor(max_workers=k) as ex:
+            rows = itertools.chain.from_iterable(ex.map(generate_chunk, tasks))
+    else:
+        rows = iter_participants(args.n)  # consumed lazily by the writer
 
     if args.json_out or args.outfile.lower().endswith(".json"):
-        with open(args.outfile if not args.outfile.endswith(".csv") else "participants.json", "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} participants to JSON.")
+        stream_json(rows, args.outfile if not args.outfile.endswith(".csv") else "participants.json")
+        print(f"Wrote {args.n} participants to JSON.")
     else:
-        fieldnames = list(rows[0].keys())
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"Wrote {len(rows)} participants to CSV: {args.outfile}")
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            w.writerows(rows)
+        print(f"Wrote {args.n} participants to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     try:
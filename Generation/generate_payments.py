@@ -21,11 +21,12 @@ Usage examples:
 
 import argparse
 import csv
+import itertools
 import json
+import os
 import random
-import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # ---------------------------
 # Config
@@ -42,90 +43,126 @@ AMOUNT_WEIGHTS = [10, 22, 28, 20, 12, 5, 3]  # favors $15–$25
 METHODS = ["gift_card", "cash", "credit_card", "paypal", "venmo"]
 METHOD_WEIGHTS = [45, 20, 15, 10, 10]  # %
 
+# Synthetic enrollment statuses (fallback pool only)
+SYNTH_STATUSES = ["enrolled", "waitlisted", "cancelled", "attended", "no_show"]
+SYNTH_STATUS_WEIGHTS = [0.45, 0.10, 0.10, 0.28, 0.07]
+
+# Payment status distribution per enrollment status; other statuses use the default table
+PAY_STATUS_TABLES = {
+    "attended": (["paid", "pending", "refunded", "failed"], [82, 8, 5, 5]),
+    "no_show": (["waived", "pending", "paid", "refunded", "failed"], [70, 10, 5, 5, 10]),
+    "cancelled": (["refunded", "void", "failed", "waived"], [60, 35, 3, 2]),
+}
+PAY_STATUS_DEFAULT = (["pending", "paid", "failed", "refunded", "waived"], [85, 5, 3, 2, 5])  # enrolled / unknown
+
+# Cumulative weights, accumulated once instead of inside every random.choices call
+AMOUNT_CUM_WEIGHTS = tuple(itertools.accumulate(AMOUNT_WEIGHTS))
+METHOD_CUM_WEIGHTS = tuple(itertools.accumulate(METHOD_WEIGHTS))
+SYNTH_STATUS_CUM_WEIGHTS = tuple(itertools.accumulate(SYNTH_STATUS_WEIGHTS))
+PAY_STATUS_CUM_TABLES = {
+    status: (labels, tuple(itertools.accumulate(weights)))
+    for status, (labels, weights) in PAY_STATUS_TABLES.items()
+}
+PAY_STATUS_DEFAULT_CUM = (PAY_STATUS_DEFAULT[0], tuple(itertools.accumulate(PAY_STATUS_DEFAULT[1])))
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["participant_id","session_id","amount","method","status"]
+
 # ---------------------------
 # Helpers
 # ---------------------------
-def pick_amount() -> int:
-    return random.choices(AMOUNT_BUCKETS, weights=AMOUNT_WEIGHTS, k=1)[0]
-
-def pick_method() -> str:
-    return random.choices(METHODS, weights=METHOD_WEIGHTS, k=1)[0]
-
-def read_enrollments(path: Path) -> List[Dict[str, Any]]:
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
+
+def read_enrollments(path: Path) -> List[Tuple[str, str, str]]:
     """
     Expects CSV/JSON with participant_id, session_id, status (other fields ignored).
-    Returns a list of dicts with those keys (missing entries skipped).
+    Returns (participant_id, session_id, status) tuples (missing entries skipped).
     """
     if not path.exists():
         return []
-    rows: List[Dict[str, Any]] = []
+    rows: List[Tuple[str, str, str]] = []
     if path.suffix.lower() == ".json":
         data = json.loads(path.read_text(encoding="utf-8"))
         for r in data:
             pid, sid = r.get("participant_id"), r.get("session_id")
             st = (r.get("status") or "").strip().lower()
             if pid and sid:
-                rows.append({"participant_id": pid, "session_id": sid, "status": st})
+                rows.append((pid, sid, st))
         return rows
-    # CSV
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        flds = set(r.fieldnames or [])
+    # CSV: positional csv.reader, no per-row dict
+    with path.open("r", encoding="utf-8", newline="") as f:
+        r = csv.reader(f)
+        header = next(r, None) or []
         need = {"participant_id", "session_id"}
-        if not need.issubset(flds):
+        if not need.issubset(header):
             return []
+        idx = {name: i for i, name in enumerate(header)}
+        pid_i, sid_i, st_i = idx["participant_id"], idx["session_id"], idx.get("status")
         for row in r:
-            pid, sid = row.get("participant_id"), row.get("session_id")
-            st = (row.get("status") or "").strip().lower()
+            n = len(row)
+            pid = row[pid_i] if pid_i < n else None
+            sid = row[sid_i] if sid_i < n else None
+            st = (row[st_i] if st_i is not None and st_i < n else "").strip().lower()
             if pid and sid:
-                rows.append({"participant_id": pid, "session_id": sid, "status": st})
+                rows.append((pid, sid, st))
     return rows
 
-def synth_enrollments(n_pairs: int) -> List[Dict[str, Any]]:
+def synth_enrollments(n_pairs: int) -> List[Tuple[str, str, str]]:
     """Create a synthetic pool of (participant_id, session_id, status)."""
-    participants = [str(uuid.uuid4()) for _ in range(FALLBACK_PARTICIPANTS)]
-    sessions = [str(uuid.uuid4()) for _ in range(FALLBACK_SESSIONS)]
-    statuses = ["enrolled", "waitlisted", "cancelled", "attended", "no_show"]
-    weights  = [0.45,       0.10,         0.10,        0.28,      0.07]
-    rows = []
-    used = set()
-    attempts = 0
-    while len(rows) < n_pairs and attempts < n_pairs * 10:
-        attempts += 1
-        pid = random.choice(participants)
-        sid = random.choice(sessions)
-        if (pid, sid) in used:
-            continue
-        rows.append({"participant_id": pid, "session_id": sid,
-                     "status": random.choices(statuses, weights=weights, k=1)[0]})
-        used.add((pid, sid))
-    return rows
-
-def map_payment_status(enrollment_status: str) -> str:
-    """Map enrollment.status to a plausible payment.status."""
+    participants = make_ids(FALLBACK_PARTICIPANTS)
+    sessions = make_ids(FALLBACK_SESSIONS)
+    # Draw distinct (participant, session) cells directly instead of retrying collisions
+    total = FALLBACK_PARTICIPANTS * FALLBACK_SESSIONS
+    cells = random.sample(range(total), min(n_pairs, total))
+    picked = random.choices(SYNTH_STATUSES, cum_weights=SYNTH_STATUS_CUM_WEIGHTS, k=len(cells))
+    return [
+        (participants[c // FALLBACK_SESSIONS], sessions[c % FALLBACK_SESSIONS], st)
+        for c, st in zip(cells, picked)
+    ]
+
+def map_payment_statuses(enrollment_status: str, k: int) -> List[str]:
+    """Map enrollment.status to k plausible payment.status values, drawn in one call."""
     s = (enrollment_status or "").lower()
-    if s == "attended":
-        return random.choices(["paid", "pending", "refunded", "failed"], [82, 8, 5, 5], k=1)[0]
-    if s == "no_show":
-        return random.choices(["waived", "pending", "paid", "refunded", "failed"], [70, 10, 5, 5, 10], k=1)[0]
-    if s == "cancelled":
-        return random.choices(["refunded", "void", "failed", "waived"], [60, 35, 3, 2], k=1)[0]
     if s == "waitlisted":
-        return "void"
-    # default: enrolled / unknown
-    return random.choices(["pending", "paid", "failed", "refunded", "waived"], [85, 5, 3, 2, 5], k=1)[0]
-
-def amount_for_status(pay_status: str) -> int:
-    """Zero out amounts for statuses where no money changes hands."""
-    if pay_status in ("void", "waived"):
-        return 0
-    return pick_amount()
-
-def method_for_status(pay_status: str) -> str:
-    """Use 'none' method when no payment is processed."""
-    if pay_status in ("void", "waived"):
-        return "none"
-    return pick_method()
+        return ["void"] * k
+    labels, cum_weights = PAY_STATUS_CUM_TABLES.get(s, PAY_STATUS_DEFAULT_CUM)
+    return random.choices(labels, cum_weights=cum_weights, k=k)
+
+def amounts_for_statuses(pay_statuses: List[str]) -> List[int]:
+    """Zero out amounts for statuses where no money changes hands; draw the rest in one call."""
+    paying = sum(1 for ps in pay_statuses if ps not in ("void", "waived"))
+    draws = iter(random.choices(AMOUNT_BUCKETS, cum_weights=AMOUNT_CUM_WEIGHTS, k=paying))
+    return [0 if ps in ("void", "waived") else next(draws) for ps in pay_statuses]
+
+def methods_for_statuses(pay_statuses: List[str]) -> List[str]:
+    """Use 'none' method when no payment is processed; draw the rest in one call."""
+    paying = sum(1 for ps in pay_statuses if ps not in ("void", "waived"))
+    draws = iter(random.choices(METHODS, cum_weights=METHOD_CUM_WEIGHTS, k=paying))
+    return ["none" if ps in ("void", "waived") else next(draws) for ps in pay_statuses]
 
 # ---------------------------
 # Main
@@ -148,42 +185,42 @@ def main():
     if not enrollments:
         enrollments = synth_enrollments(args.fallback_pool)
 
-    # Build payments
-    rows: List[Dict[str, Any]] = []
-    used_pairs = set()  # prevent duplicate payments for same (participant_id, session_id)
-    attempts = 0
-    max_attempts = args.n * 10
-    while len(rows) < args.n and attempts < max_attempts:
-        attempts += 1
-        e = random.choice(enrollments)
-        pair = (e["participant_id"], e["session_id"])
-        if pair in used_pairs:
-            continue
-        pay_status = map_payment_status(e.get("status", ""))
-        amount = amount_for_status(pay_status)
-        method = method_for_status(pay_status)
-        rows.append({
-            "participant_id": e["participant_id"],
-            "session_id": e["session_id"],
-            "amount": amount,
-            "method": method,
-            "status": pay_status,
-        })
-        used_pairs.add(pair)
+    # Build payments: one per distinct (participant_id, session_id), keeping the first
+    # enrollment row seen for a pair, sampled without replacement
+    by_pair: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+    for e in enrollments:
+        by_pair.setdefault(e[:2], e)
+    picked = random.sample(list(by_pair.values()), min(args.n, len(by_pair)))
+
+    # Bucket rows by enrollment status so each bucket's payment statuses come from one draw
+    buckets: Dict[str, List[int]] = {}
+    for i, (_, _, status) in enumerate(picked):
+        buckets.setdefault(status, []).append(i)
+    pay_statuses: List[str] = [""] * len(picked)
+    for status, idxs in buckets.items():
+        for i, pay_status in zip(idxs, map_payment_statuses(status, len(idxs))):
+            pay_statuses[i] = pay_status
+    amounts = amounts_for_statuses(pay_statuses)
+    methods = methods_for_statuses(pay_statuses)
+
+    rows = (  # consumed lazily by the writer
+        (pid, sid, amount, method, pay_status)
+        for (pid, sid, _), amount, method, pay_status in zip(picked, amounts, methods, pay_statuses)
+    )
 
     # Write out
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "payments.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} payments to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {len(picked)} payments to JSON: {out}")
     else:
-        fieldnames = ["participant_id","session_id","amount","method","status"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
+        # csv.writer, not hand-formatted lines: participant/session ids from --enrollments-file
+        # are arbitrary text and may need quoting
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
             w.writerows(rows)
-        print(f"Wrote {len(rows)} payments to CSV: {args.outfile}")
+        print(f"Wrote {len(picked)} payments to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
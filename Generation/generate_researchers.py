@@ -23,9 +23,11 @@ Options:
 import argparse
 import csv
 import json
+import os
 import random
-import uuid
+import time
 from datetime import date, datetime, timedelta
+from typing import List, Tuple
 
 # ---------------------------
 # Config
@@ -37,46 +39,88 @@ SIGNED_WINDOW_DAYS = 540
 # If withdrawn, must occur within this many days after signedAt (and not after "today")
 WITHDRAW_MAX_DAYS_AFTER_SIGN = 240
 
-# ---------------------------
-# Helpers
-# ---------------------------
-def rand_dt_between(start_dt: datetime, end_dt: datetime) -> datetime:
-    if end_dt < start_dt:
-        start_dt, end_dt = end_dt, start_dt
-    delta = int((end_dt - start_dt).total_seconds())
-    return start_dt + timedelta(seconds=random.randint(0, max(0, delta)))
+# Window bounds as EPOCH seconds, computed once
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+TODAY_START = datetime.combine(TODAY, datetime.min.time())
+TODAY_END_S = int((TODAY_START + timedelta(hours=23, minutes=59, seconds=59) - EPOCH).total_seconds())
+SIGNED_FROM_S = int((TODAY_START - timedelta(days=SIGNED_WINDOW_DAYS) - EPOCH).total_seconds())
 
-def today_start() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time())
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
 
-def today_end() -> datetime:
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=23, minutes=59, seconds=59)
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
 
-def make_id() -> str:
-    return str(uuid.uuid4())
+# ---------------------------
+# Helpers
+# ---------------------------
+def seconds_at_fraction(a: int, b: int, r: float) -> int:
+    """Place an epoch-seconds timestamp between a and b using a pre-drawn uniform r in [0, 1)."""
+    if b < a:
+        a, b = b, a
+    return a + int(r * (b - a + 1))
+
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
 # Row factory
 # ---------------------------
-def make_row(pid: str, cvid: str, withdraw_rate: float) -> dict:
-    # signedAt somewhere in the last SIGNED_WINDOW_DAYS
-    start = today_start() - timedelta(days=SIGNED_WINDOW_DAYS)
-    signed_at = rand_dt_between(start, today_end())
+def make_row(row_id: str, pid: str, cvid: str, withdraw_rate: float, u: float, r1: float, r2: float) -> tuple:
+    """u gates withdrawal against withdraw_rate; r1/r2 place signedAt/withdrawnAt in their windows."""
+    # signedAt somewhere in the last SIGNED_WINDOW_DAYS (EPOCH seconds)
+    signed_s = seconds_at_fraction(SIGNED_FROM_S, TODAY_END_S, r1)
 
     # maybe withdrawn after signedAt, but not beyond today or WITHDRAW_MAX_DAYS_AFTER_SIGN
     withdrawn_at = ""
-    if random.random() < withdraw_rate:
-        latest = min(signed_at + timedelta(days=WITHDRAW_MAX_DAYS_AFTER_SIGN), today_end())
-        if latest > signed_at:
-            withdrawn_at = rand_dt_between(signed_at + timedelta(minutes=1), latest).isoformat(timespec="seconds")
-
-    return {
-        "participant_consent_id": make_id(),
-        "participant_id": pid,
-        "consent_version_id": cvid,
-        "signedAt": signed_at.isoformat(timespec="seconds"),
-        "withdrawnAt": withdrawn_at,
-    }
+    if u < withdraw_rate:
+        latest = min(signed_s + WITHDRAW_MAX_DAYS_AFTER_SIGN * 86400, TODAY_END_S)
+        if latest > signed_s:
+            withdrawn_at = iso_from_seconds(seconds_at_fraction(signed_s + 60, latest, r2))
+
+    return (
+        row_id,
+        pid,
+        cvid,
+        iso_from_seconds(signed_s),
+        withdrawn_at,
+    )
+
+def sample_pairs(n_participants: int, n_versions: int, n: int, allow_duplicates: bool) -> List[Tuple[int, int]]:
+    """
+    (participant_idx, version_idx) per row. Without duplicates, distinct cells are drawn
+    directly with random.sample, so nothing is rejected; the row count is capped at P * V.
+    """
+    if n_participants <= 0 or n_versions <= 0:
+        return []
+    if allow_duplicates:
+        return list(zip(random.choices(range(n_participants), k=n), random.choices(range(n_versions), k=n)))
+    cells = random.sample(range(n_participants * n_versions), min(n, n_participants * n_versions))
+    return [divmod(c, n_versions) for c in cells]
 
 # ---------------------------
 # Main
@@ -96,40 +140,34 @@ def main():
     random.seed(args.seed)
 
     # Build pools of participant_ids and consent_version_ids
-    participants = [make_id() for _ in range(args.participants)]
-    versions = [make_id() for _ in range(args.versions)]
-
-    rows = []
-    used_pairs = set()
-    attempts = 0
-    max_attempts = args.n * 10
-
-    while len(rows) < args.n and attempts < max_attempts:
-        attempts += 1
-        pid = random.choice(participants)
-        cvid = random.choice(versions)
-        pair = (pid, cvid)
-
-        if not args.allow_duplicates and pair in used_pairs:
-            continue
-
-        row = make_row(pid, cvid, args.withdraw_rate)
-        rows.append(row)
-        used_pairs.add(pair)
+    participants = make_ids(args.participants)
+    versions = make_ids(args.versions)
+
+    pairs = sample_pairs(len(participants), len(versions), args.n, args.allow_duplicates)
+    row_ids = make_ids(len(pairs))
+
+    # Uniforms for signing/withdrawal are drawn as blocks, one list per use
+    k = len(pairs)
+    rand = random.random
+    u = [rand() for _ in range(k)]
+    r1 = [rand() for _ in range(k)]
+    r2 = [rand() for _ in range(k)]
+    rows = (  # consumed lazily by the writer
+        make_row(row_ids[j], participants[pi], versions[vi], args.withdraw_rate, u[j], r1[j], r2[j])
+        for j, (pi, vi) in enumerate(pairs)
+    )
 
     # Write out
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "ParticipantConsents.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} ParticipantConsent rows to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {len(pairs)} ParticipantConsent rows to JSON: {out}")
     else:
-        fieldnames = ["participant_consent_id","participant_id","consent_version_id","signedAt","withdrawnAt"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
             w.writerows(rows)
-        print(f"Wrote {len(rows)} ParticipantConsent rows to CSV: {args.outfile}")
+        print(f"Wrote {len(pairs)} ParticipantConsent rows to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
@@ -11,9 +11,9 @@ Usage examples:
 """
 
 import argparse
-import csv
 import json
 import random
+from typing import Dict, Iterator, List, Tuple
 
 # ---------------------------
 # Vocabularies
@@ -37,64 +37,73 @@ ROOM_TYPES = [
 
 LETTERS = list("ABCDEFGHJKMNPQRSTUVWXZ")  # omit confusing I/O/Y/Z sometimes
 
+# Every plausible room name per type, enumerated once
+ROOM_NAMES = {
+    "lecture": tuple(f"Lecture Hall {i}" for i in range(1, 301)),                   # Lecture Hall 1..300
+    "lab": tuple(f"Lab {i}{s}" for i in range(1, 81) for s in ["", *LETTERS]),       # Lab 1..80 + optional letter
+    "seminar": tuple(f"Seminar {i}" for i in range(100, 600)),                       # Seminar 100..599
+    "studio": tuple(f"Studio {c}-{i}" for c in LETTERS for i in range(1, 21)),       # Studio A..Z + 1..20
+    "room": tuple(f"{fl}-{num:02d}" for fl in range(1, 7) for num in range(1, 36)),  # floor + number (e.g., 2-14)
+}
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["name", "building", "capacity"]
+
+# Seat capacity range (inclusive) per room type
+CAPACITY_RANGES = {
+    "lecture": (80, 300),
+    "lab": (12, 30),
+    "seminar": (10, 24),
+    "studio": (15, 35),
+    "room": (18, 45),  # generic rooms
+}
+
 # ---------------------------
 # Helpers
 # ---------------------------
-def pick_room_name(rtype: str) -> str:
-    # Generate a plausible room name based on type
-    if rtype == "lecture":
-        # Lecture Hall 1..300
-        return f"Lecture Hall {random.randint(1, 300)}"
-    if rtype == "lab":
-        # Lab 1..80 + optional letter
-        base = f"Lab {random.randint(1, 80)}"
-        return base + random.choice(["", f"{random.choice(LETTERS)}"])
-    if rtype == "seminar":
-        # Seminar 100..599
-        return f"Seminar {random.randint(100, 599)}"
-    if rtype == "studio":
-        # Studio A..Z + 1..20
-        return f"Studio {random.choice(LETTERS)}-{random.randint(1, 20)}"
-    # generic room: floor + number (e.g., 2-14, 3-08)
-    floor = random.randint(1, 6)
-    num = random.randint(1, 35)
-    return f"{floor}-{num:02d}"
-
-def pick_capacity(rtype: str) -> int:
-    if rtype == "lecture":
-        return random.randint(80, 300)
-    if rtype == "lab":
-        return random.randint(12, 30)
-    if rtype == "seminar":
-        return random.randint(10, 24)
-    if rtype == "studio":
-        return random.randint(15, 35)
-    # generic rooms
-    return random.randint(18, 45)
-
-def make_row(existing_pairs) -> dict:
-    building = random.choice(BUILDINGS)
-    # ensure (building, name) uniqueness
-    for _ in range(20):  # try a few times to avoid collisions
-        rtype = random.choice(ROOM_TYPES)
-        name = pick_room_name(rtype)
-        if (building, name) not in existing_pairs:
-            existing_pairs.add((building, name))
-            return {
-                "name": name,
-                "building": building,
-                "capacity": pick_capacity(rtype),
-            }
-    # fallback: force unique by appending a suffix
-    suffix = random.randint(1000, 9999)
-    rtype = random.choice(ROOM_TYPES)
-    name = f"{pick_room_name(rtype)}-{suffix}"
-    existing_pairs.add((building, name))
-    return {
-        "name": name,
-        "building": building,
-        "capacity": pick_capacity(rtype),
-    }
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
+
+def iter_rooms(n: int) -> Iterator[tuple]:
+    """
+    Yield n (name, building, capacity) rows with unique (building, name) pairs.
+    Building and room type are drawn per row; each (building, type) group then takes
+    distinct names from that type's ROOM_NAMES with random.sample, so nothing is retried.
+    """
+    buildings = random.choices(BUILDINGS, k=n)
+    rtypes = random.choices(ROOM_TYPES, k=n)
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, key in enumerate(zip(buildings, rtypes)):
+        groups.setdefault(key, []).append(i)
+
+    names: List[str] = [""] * n
+    for (_, rtype), idxs in groups.items():
+        space = ROOM_NAMES[rtype]
+        picked = random.sample(space, min(len(idxs), len(space)))
+        # fallback once a group outgrows its name space: append a suffix, drawn without
+        # replacement within the group so the suffixed names stay distinct too
+        extra = len(idxs) - len(picked)
+        if extra > 0:
+            picked += [f"{random.choice(space)}-{sfx}" for sfx in random.sample(range(1000, 10000), extra)]
+        for i, name in zip(idxs, picked):
+            names[i] = name
+
+    randint = random.randint  # bound once for the per-row loop
+    for name, building, rtype in zip(names, buildings, rtypes):
+        yield (name, building, randint(*CAPACITY_RANGES[rtype]))
 
 # ---------------------------
 # Main
@@ -109,23 +118,19 @@ def main():
 
     random.seed(args.seed)
 
-    rows = []
-    seen = set()  # (building, name)
-    for _ in range(args.n):
-        rows.append(make_row(seen))
+    rows = iter_rooms(args.n)  # consumed lazily by the writer
 
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "rooms.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} rooms to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {args.n} rooms to JSON: {out}")
     else:
-        fieldnames = ["name", "building", "capacity"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
-        print(f"Wrote {len(rows)} rooms to CSV: {args.outfile}")
+        # Names and buildings come from fixed vocabularies with no commas, quotes or newlines,
+        # so lines are formatted directly; "\r\n" matches csv.writer's line terminator
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            f.write(",".join(FIELDNAMES) + "\r\n")
+            f.writelines("%s,%s,%d\r\n" % r for r in rows)
+        print(f"Wrote {args.n} rooms to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
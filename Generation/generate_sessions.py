@@ -22,9 +22,13 @@ Usage examples:
 """
 
 import argparse
+import bisect
 import csv
+import hashlib
 import json
+import os
 import random
+import time
 import uuid
 from datetime import date, datetime, timedelta
 from pathlib import Path
@@ -34,6 +38,7 @@ from typing import Any, Dict, List, Optional, Tuple
 # Config
 # ---------------------------
 TODAY = date(2025, 9, 21)  # stable for reproducibility
+TODAY_START = datetime.combine(TODAY, datetime.min.time())  # built once, not per call
 
 # Time window (relative to TODAY) for scheduling sessions
 DAYS_PAST = 10
@@ -47,29 +52,70 @@ START_HOUR_MAX = 19
 DURATION_MIN = 45
 DURATION_MAX = 120
 
+# Sessions start on a quarter-hour grid (:00, :15, :30, :45)
+SLOT_SECONDS = 15 * 60
+
 # If no room file, fallback room capacity range
 ROOM_CAP_FALLBACK = (18, 60)
 
+# Session times are EPOCH seconds; midnight of TODAY computed once
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+TODAY_START_S = int((TODAY_START - EPOCH).total_seconds())
+
+# SHA-1 state after the NAMESPACE_URL prefix; uuid5 ids copy it instead of rehashing the namespace
+NAMESPACE_URL_SHA1 = hashlib.sha1(uuid.NAMESPACE_URL.bytes)
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["study_id","room_id","startTs","endTs","capacity"]
+
 # ---------------------------
 # Helpers
 # ---------------------------
 def today_at(h: int, m: int = 0) -> datetime:
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=h, minutes=m)
+    return TODAY_START + timedelta(hours=h, minutes=m)
 
-def random_start_dt() -> datetime:
-    # choose a day offset and a minute slot
-    day_offset = random.randint(-DAYS_PAST, DAYS_FUTURE)
-    hour = random.randint(START_HOUR_MIN, START_HOUR_MAX)
-    minute = random.choice([0, 15, 30, 45])
-    return datetime.combine(TODAY, datetime.min.time()) + timedelta(days=day_offset, hours=hour, minutes=minute)
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
 
-def iso(dt: datetime) -> str:
-    return dt.isoformat(timespec="seconds")
+def uuid5_url(name: str) -> str:
+    """Same string as str(uuid.uuid5(uuid.NAMESPACE_URL, name)), without building a UUID object."""
+    h = NAMESPACE_URL_SHA1.copy()
+    h.update(name.encode("utf-8"))
+    d = h.hexdigest()
+    # version nibble 5 and variant bits 10xx (RFC 4122), as uuid.uuid5 sets them
+    return f"{d[:8]}-{d[8:12]}-5{d[13:16]}-{'89ab'[int(d[16], 16) & 3]}{d[17:20]}-{d[20:32]}"
 
 def derive_room_id_from_name(building: str, name: str) -> str:
     # Stable UUID5 based on (building:name) so joins are reproducible
     basis = f"{(building or '').strip()}::{(name or '').strip()}"
-    return str(uuid.uuid5(uuid.NAMESPACE_URL, basis))
+    return uuid5_url(basis)
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
 
 # ---------------------------
 # Readers (optional local files)
@@ -86,11 +132,14 @@ def read_study_ids(path: Path) -> List[str]:
         # Accept raw list
         return [str(x) for x in data]
     # CSV
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames or "study_id" not in r.fieldnames:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Plain csv.reader + one column index: no per-row dict, and only the id column is kept
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or "study_id" not in header:
             return []
-        return [row["study_id"] for row in r if row.get("study_id")]
+        i = header.index("study_id")
+        return [row[i] for row in reader if len(row) > i and row[i]]
 
 def read_rooms(path: Path) -> List[Dict[str, Any]]:
     """
@@ -110,29 +159,32 @@ def read_rooms(path: Path) -> List[Dict[str, Any]]:
                 if name:
                     rid = derive_room_id_from_name(building, name)
                 else:
-                    rid = str(uuid.uuid4())
+                    rid = make_ids(1)[0]
             cap_raw = row.get("capacity")
             cap = int(cap_raw) if isinstance(cap_raw, int) or (isinstance(cap_raw, str) and cap_raw.isdigit()) else None
             rows.append({"room_id": rid, "capacity": cap})
         return rows
     # CSV
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        has_room_id = r.fieldnames and "room_id" in r.fieldnames
-        has_name = r.fieldnames and "name" in r.fieldnames
-        has_building = r.fieldnames and "building" in r.fieldnames
-        has_capacity = r.fieldnames and "capacity" in r.fieldnames
-        for row in r:
-            if has_room_id:
-                rid = row.get("room_id") or str(uuid.uuid4())
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Positional csv.reader; column indices looked up once from the header
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        idx = {name: i for i, name in enumerate(header)}
+        rid_i, name_i, bldg_i, cap_i = idx.get("room_id"), idx.get("name"), idx.get("building"), idx.get("capacity")
+        for row in reader:
+            if not row:
+                continue  # blank line (DictReader skipped these too)
+            n = len(row)
+            if rid_i is not None:
+                rid = (row[rid_i] if rid_i < n else "") or make_ids(1)[0]
             else:
-                nm = row.get("name", "") if has_name else ""
-                bldg = row.get("building", "") if has_building else ""
-                rid = derive_room_id_from_name(bldg, nm) if nm else str(uuid.uuid4())
+                nm = row[name_i] if name_i is not None and name_i < n else ""
+                bldg = row[bldg_i] if bldg_i is not None and bldg_i < n else ""
+                rid = derive_room_id_from_name(bldg, nm) if nm else make_ids(1)[0]
             cap = None
-            if has_capacity:
+            if cap_i is not None:
                 try:
-                    cap = int(row["capacity"])
+                    cap = int(row[cap_i])
                 except Exception:
                     cap = None
             rows.append({"room_id": rid, "capacity": cap})
@@ -141,31 +193,59 @@ def read_rooms(path: Path) -> List[Dict[str, Any]]:
 # ---------------------------
 # Non-overlap scheduling per room
 # ---------------------------
-def overlaps(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> bool:
-    return not (a_end <= b_start or b_end <= a_start)
+def free_slot_runs(existing: List[Tuple[int, int]], first: int, last: int, dur_s: int) -> List[Tuple[int, int]]:
+    """
+    Runs (a, b) of slot indices k, with start = first + k * SLOT_SECONDS in [first, last], whose
+    [start, start + dur_s) overlaps nothing in existing. existing is sorted by start, so one sweep
+    over the intervals near the day yields every gap; no earlier interval can reach first.
+    """
+    lo = bisect.bisect_left(existing, (first - DURATION_MAX * 60 + 1,))
+    hi = bisect.bisect_left(existing, (last + dur_s,), lo)
+    runs: List[Tuple[int, int]] = []
+    cursor = first  # earliest start not covered by an interval seen so far
+    # the sentinel closes the last gap at start == last
+    for s, e in existing[lo:hi] + [(last + dur_s, last + dur_s)]:
+        if s - dur_s >= cursor:
+            a = -((first - cursor) // SLOT_SECONDS)  # first grid slot at or after cursor
+            b = (s - dur_s - first) // SLOT_SECONDS  # last grid slot ending by s
+            if a <= b:
+                runs.append((a, b))
+        cursor = max(cursor, e)
+    return runs
 
-def pick_times_for_room(existing: List[Tuple[datetime, datetime]]) -> Tuple[datetime, datetime]:
+def pick_times_for_room(existing: List[Tuple[int, int]]) -> Tuple[int, int]:
     """
     Pick a start/end that doesn't overlap existing intervals for the room.
-    Try a handful of times before giving up overlap avoidance.
+    A day and duration are drawn, then the start is drawn uniformly from that day's free
+    slots (so each gap is weighted by its length). Only a day with no free slot is redrawn;
+    after a handful of fully booked days, overlap avoidance is given up.
     """
     for _ in range(20):
-        start = random_start_dt()
-        duration = random.randint(DURATION_MIN, DURATION_MAX)
-        end = start + timedelta(minutes=duration)
-        if all(not overlaps(start, end, s, e) for (s, e) in existing):
-            return start, end
-    # Fallback: return the last attempt even if overlapping
-    return start, end
+        day_s = TODAY_START_S + random.randint(-DAYS_PAST, DAYS_FUTURE) * 86400
+        dur_s = random.randint(DURATION_MIN, DURATION_MAX) * 60
+        first = day_s + START_HOUR_MIN * 3600
+        last = day_s + START_HOUR_MAX * 3600 + 3600 - SLOT_SECONDS
+        runs = free_slot_runs(existing, first, last, dur_s)
+        if runs:
+            k = random.randrange(sum(b - a + 1 for a, b in runs))
+            for a, b in runs:
+                if k <= b - a:
+                    break
+                k -= b - a + 1
+            start = first + (a + k) * SLOT_SECONDS
+            return start, start + dur_s
+    # Fallback: every drawn day was fully booked; overlap on a random slot of the last one
+    start = first + random.randrange((last - first) // SLOT_SECONDS + 1) * SLOT_SECONDS
+    return start, start + dur_s
 
 # ---------------------------
 # Row factory
 # ---------------------------
-def make_row(study_id: str, room: Dict[str, Any], room_schedules: Dict[str, List[Tuple[datetime, datetime]]]) -> Dict[str, Any]:
+def make_row(study_id: str, room: Dict[str, Any], room_schedules: Dict[str, List[Tuple[int, int]]]) -> tuple:
     rid = room["room_id"]
     sched = room_schedules.setdefault(rid, [])
     start, end = pick_times_for_room(sched)
-    sched.append((start, end))
+    bisect.insort(sched, (start, end))  # kept sorted by start for pick_times_for_room
 
     # Session capacity: respect room capacity when available
     if room.get("capacity"):
@@ -174,13 +254,13 @@ def make_row(study_id: str, room: Dict[str, Any], room_schedules: Dict[str, List
     else:
         capacity = random.randint(*ROOM_CAP_FALLBACK)
 
-    return {
-        "study_id": study_id,
-        "room_id": rid,
-        "startTs": iso(start),
-        "endTs": iso(end),
-        "capacity": capacity,
-    }
+    return (
+        study_id,
+        rid,
+        iso_from_seconds(start),
+        iso_from_seconds(end),
+        capacity,
+    )
 
 # ---------------------------
 # Main
@@ -204,16 +284,16 @@ def main():
     # Load or synthesize studies
     study_ids = read_study_ids(Path(args.studies_file))
     if not study_ids:
-        study_ids = [str(uuid.uuid4()) for _ in range(args.study_pool)]
+        study_ids = make_ids(args.study_pool)
 
     # Load or synthesize rooms
     rooms = read_rooms(Path(args.rooms_file))
     if not rooms:
-        rooms = [{"room_id": str(uuid.uuid4()), "capacity": random.randint(*ROOM_CAP_FALLBACK)} for _ in range(args.room_pool)]
+        rooms = [{"room_id": rid, "capacity": random.randint(*ROOM_CAP_FALLBACK)} for rid in make_ids(args.room_pool)]
 
     # Build rows
-    room_schedules: Dict[str, List[Tuple[datetime, datetime]]] = {}
-    rows: List[Dict[str, Any]] = []
+    room_schedules: Dict[str, List[Tuple[int, int]]] = {}
+    rows: List[tuple] = []
     for _ in range(args.n):
         study_id = random.choice(study_ids)
         room = random.choice(rooms)
@@ -222,14 +302,12 @@ def main():
     # Write
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "sessions.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
+        stream_json(rows, out)
         print(f"Wrote {len(rows)} sessions to JSON: {out}")
     else:
-        fieldnames = ["study_id","room_id","startTs","endTs","capacity"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
             w.writerows(rows)
         print(f"Wrote {len(rows)} sessions to CSV: {args.outfile}")
 
@@ -13,44 +13,78 @@ Usage:
 
 import argparse
 import csv
+import itertools
 import json
+import os
 import random
-import uuid
-from datetime import date, datetime, timedelta
+import time
+from datetime import date, datetime
+from typing import Iterator, List
 
 TODAY = date(2025, 9, 21)  # stable for reproducibility
+TODAY_START = datetime.combine(TODAY, datetime.min.time())  # built once, not per row
+EPOCH = datetime(1970, 1, 1)  # naive epoch for integer-second timestamp arithmetic
+TODAY_START_S = int((TODAY_START - EPOCH).total_seconds())
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = [
+    "study_id","title","description","minAge","maxAge",
+    "minGPA","cooldownDays","active","created_at","updated_at"
+]
 
 # ---------------------------
 # Vocabularies
 # ---------------------------
-DOMAINS = [
+DOMAINS = (
     "Cognitive Psychology", "Human-Computer Interaction", "Sleep & Memory",
     "Nutrition & Performance", "Exercise Science", "Social Behavior",
     "Learning & Education", "Attention & Perception", "Language Processing",
     "Decision Making", "Neuroscience", "Mental Health", "Usability Testing",
     "Human Factors", "Affect & Emotion", "Motivation & Goals",
-]
-METHODS = [
+)
+METHODS = (
     "online survey", "lab-based task", "EEG session", "eye-tracking study",
     "VR interaction task", "mobile app diary", "A/B usability test",
     "behavioral game", "reaction-time task", "interview session",
-]
-POPULATIONS = [
+)
+POPULATIONS = (
     "undergraduates", "graduate students", "general adults", "bilingual speakers",
     "habitual nappers", "competitive athletes", "night owls", "early risers",
     "heavy social media users", "first-year students", "STEM majors",
-]
-INCENTIVES = [
+)
+INCENTIVES = (
     "$10 gift card", "$15 gift card", "$20 gift card", "course credit",
     "$25 gift card", "snacks + course credit"
-]
-GOALS = [
+)
+GOALS = (
     "measure short-term memory accuracy", "quantify decision speed under time pressure",
     "evaluate UI learnability", "assess the impact of sleep duration on recall",
     "study effects of nutrition on reaction time", "model social conformity behavior",
     "compare different feedback strategies on learning", "analyze eye movements during reading",
     "test usability of a new mobile interface", "understand bilingual lexical access",
-]
+)
+
+# Short, plausible study titles
+TITLE_TEMPLATES = (
+    "{domain}: {goal}",
+    "{domain} via {method}",
+    "{goal} ({domain})",
+    "{domain} – {goal}",
+)
+EST_MINUTES = (20, 30, 35, 45, 60, 75, 90)
+
+# Eligibility: typical IRB age ranges (18–65, skewed to 18+)
+MIN_AGES = (18, 18, 18, 21)
+MAX_AGES = (45, 55, 60, 65)
+# Many studies accept a wide GPA range; skew toward 2.0–3.0
+MIN_GPAS = (2.0, 2.3, 2.5, 2.7, 3.0, 3.2, 3.5)
+MIN_GPA_CUM_WEIGHTS = tuple(itertools.accumulate([30, 15, 20, 12, 15, 6, 2]))  # favors lower thresholds
+# Cooldown between enrollments in the SAME study
+COOLDOWN_DAYS = (0, 7, 14, 21, 30)
+ACTIVE_RATE = 0.7  # ~70% active by default
 
 # ---------------------------
 # Helpers
@@ -58,83 +92,91 @@ GOALS = [
 def sentence_case(s: str) -> str:
     return s[0].upper() + s[1:] if s else s
 
-def make_title():
-    domain = random.choice(DOMAINS)
-    method = random.choice(METHODS)
-    goal = random.choice(GOALS)
-    # Short, plausible study title
-    variants = [
-        f"{domain}: {sentence_case(goal)}",
-        f"{domain} via {method.title()}",
-        f"{sentence_case(goal)} ({domain})",
-        f"{domain} – {sentence_case(goal)}",
-    ]
-    return random.choice(variants)
-
-def make_description():
-    domain = random.choice(DOMAINS)
-    method = random.choice(METHODS)
-    pop = random.choice(POPULATIONS)
-    incentive = random.choice(INCENTIVES)
-    goal = random.choice(GOALS)
-    est = random.choice([20, 30, 35, 45, 60, 75, 90])
+def make_title(template: str, domain: str, method: str, goal: str) -> str:
+    return template.format(domain=domain, method=method.title(), goal=sentence_case(goal))
+
+def make_description(domain: str, method: str, pop: str, incentive: str, goal: str, est: int) -> str:
     return (
         f"This {domain.lower()} study uses a {method} with {pop}. "
         f"It aims to {goal}. Approx. {est} minutes. Compensation: {incentive}. "
         "Participation is voluntary; you may withdraw at any time."
     )
 
-def bounded_age_pair():
-    # Typical IRB ranges; allow 18–65, with some broader
-    min_age = random.choice([18, 18, 18, 21])  # skew to 18+
-    max_age = random.choice([45, 55, 60, 65])
-    if max_age < min_age:
-        max_age = min_age + random.randint(1, 5)
-    return min_age, max_age
-
-def random_min_gpa():
-    # Many studies accept wide range; skew toward 2.0–3.0
-    choices = [2.0, 2.3, 2.5, 2.7, 3.0, 3.2, 3.5]
-    weights =  [30,  15,  20,  12,  15,   6,   2]  # favors lower thresholds
-    return random.choices(choices, weights=weights, k=1)[0]
-
-def random_cooldown_days():
-    # Cooldown between enrollments in the SAME study
-    return random.choice([0, 7, 14, 21, 30])
-
-def random_active_flag():
-    # ~70% active by default
-    return random.random() < 0.7
-
-def rand_ts_between(days_back=365):
-    seconds_back = random.randint(0, days_back * 24 * 3600)
-    dt = datetime.combine(TODAY, datetime.min.time()) + timedelta(seconds=seconds_back)
-    return dt
-
-def make_row():
-    study_id = str(uuid.uuid4())
-    title = make_title()
-    description = make_description()
-    min_age, max_age = bounded_age_pair()
-    min_gpa = random_min_gpa()
-    cooldown = random_cooldown_days()
-    active = random_active_flag()
-
-    created_at = rand_ts_between(540)
-    updated_at = created_at + timedelta(days=random.randint(0, 180), seconds=random.randint(0, 86400))
-
-    return {
-        "study_id": study_id,
-        "title": title,
-        "description": description,
-        "minAge": min_age,
-        "maxAge": max_age,
-        "minGPA": round(min_gpa, 2),
-        "cooldownDays": cooldown,
-        "active": active,
-        "created_at": created_at.isoformat(timespec="seconds"),
-        "updated_at": updated_at.isoformat(timespec="seconds"),
-    }
+def rand_ts_between(days_back=365) -> int:
+    # Random timestamp within N days of today, as EPOCH seconds
+    return TODAY_START_S + random.randint(0, days_back * 24 * 3600)
+
+def iso_from_seconds(sec: int) -> str:
+    # Same text as isoformat(timespec="seconds") for naive EPOCH-relative seconds, without a datetime
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
+
+def iter_studies(n: int) -> Iterator[tuple]:
+    """
+    Yield n study rows (tuples in FIELDNAMES order). Every vocabulary and eligibility pick
+    is drawn for all rows up front in a single random.choices(..., k=n) call per field; each
+    row then only formats its text and timestamps as the writer pulls it.
+    """
+    ids = make_ids(n)
+    templates = random.choices(TITLE_TEMPLATES, k=n)
+    title_domains = random.choices(DOMAINS, k=n)
+    title_methods = random.choices(METHODS, k=n)
+    title_goals = random.choices(GOALS, k=n)
+    domains = random.choices(DOMAINS, k=n)
+    methods = random.choices(METHODS, k=n)
+    pops = random.choices(POPULATIONS, k=n)
+    incentives = random.choices(INCENTIVES, k=n)
+    goals = random.choices(GOALS, k=n)
+    ests = random.choices(EST_MINUTES, k=n)
+    min_ages = random.choices(MIN_AGES, k=n)
+    max_ages = random.choices(MAX_AGES, k=n)
+    min_gpas = random.choices(MIN_GPAS, cum_weights=MIN_GPA_CUM_WEIGHTS, k=n)
+    cooldowns = random.choices(COOLDOWN_DAYS, k=n)
+    rand = random.random
+    actives = [rand() < ACTIVE_RATE for _ in range(n)]
+
+    randint = random.randint  # bound once for the per-row loop
+    for i, study_id in enumerate(ids):
+        min_age, max_age = min_ages[i], max_ages[i]
+        if max_age < min_age:
+            max_age = min_age + randint(1, 5)
+        created_s = rand_ts_between(540)
+        # updated_at at or after created_at
+        updated_s = created_s + randint(0, 180) * 86400 + randint(0, 86400)
+        yield (
+            study_id,
+            make_title(templates[i], title_domains[i], title_methods[i], title_goals[i]),
+            make_description(domains[i], methods[i], pops[i], incentives[i], goals[i], ests[i]),
+            min_age,
+            max_age,
+            min_gpas[i],
+            cooldowns[i],
+            actives[i],
+            iso_from_seconds(created_s),
+            iso_from_seconds(updated_s),
+        )
 
 # ---------------------------
 # Main
@@ -149,24 +191,20 @@ def main():
 
     random.seed(args.seed)
 
-    rows = [make_row() for _ in range(args.n)]
+    rows = iter_studies(args.n)  # consumed lazily by the writer
 
     # CSV or JSON
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "studies.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} studies to JSON: {out}")
+        stream_json(rows, out)
+        print(f"Wrote {args.n} studies to JSON: {out}")
     else:
-        fieldnames = [
-            "study_id","title","description","minAge","maxAge",
-            "minGPA","cooldownDays","active","created_at","updated_at"
-        ]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
+        # Titles and descriptions are free text, so these still go through csv.writer quoting
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDNAMES)
             writer.writerows(rows)
-        print(f"Wrote {len(rows)} studies to CSV: {args.outfile}")
+        print(f"Wrote {args.n} studies to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
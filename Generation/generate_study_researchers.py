@@ -22,11 +22,13 @@ Usage:
 
 import argparse
 import csv
+import itertools
 import json
+import os
 import random
-import uuid
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
 
 # ---------------------------
 # Config
@@ -42,10 +44,48 @@ RA_MAX_DEFAULT = 3
 
 TOPUP_ROLE_WEIGHTS = {"RA": 0.80, "coordinator": 0.15, "PI": 0.05}
 
+# Cumulative weights, accumulated once instead of inside every random.choices call
+COORD_CUM_WEIGHTS = tuple(itertools.accumulate(COORD_WEIGHTS))
+TOPUP_ROLE_LABELS = tuple(TOPUP_ROLE_WEIGHTS)
+TOPUP_ROLE_CUM_WEIGHTS = tuple(itertools.accumulate(TOPUP_ROLE_WEIGHTS.values()))
+
+# Output file buffer size; fewer write() syscalls than the 8 KB default
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Output column order; rows are built as tuples in this order
+FIELDNAMES = ["study_id","researcher_id","role"]
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def make_ids(n: int) -> List[str]:
+    """n random version-4 UUID strings from a single os.urandom read."""
+    buf = os.urandom(16 * n).hex()
+    out: List[str] = []
+    for i in range(0, 32 * n, 32):
+        h = buf[i:i + 32]
+        # force the version nibble to 4 and the variant bits to 10xx (RFC 4122)
+        out.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+    return out
+
+def stream_json(rows, path: str) -> int:
+    """Write rows as a JSON array with one compact FIELDNAMES-keyed object per line; returns the row count."""
+    enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+        sep = "[\n"
+        n = 0
+        for n, r in enumerate(rows, 1):
+            f.write(sep)
+            f.write(enc.encode(dict(zip(FIELDNAMES, r))))
+            sep = ",\n"
+        f.write("[]\n" if n == 0 else "\n]\n")
+    return n
+
 # ---------------------------
 # Readers
 # ---------------------------
 def read_study_ids(primary: Path, alternate: Path) -> List[str]:
+    """Distinct study ids in first-seen order; a repeated id would be drawn more often."""
     path = primary if primary.exists() else (alternate if alternate.exists() else None)
     if path is None:
         return []
@@ -54,15 +94,19 @@ def read_study_ids(primary: Path, alternate: Path) -> List[str]:
         if not data:
             return []
         if isinstance(data, list) and data and isinstance(data[0], dict):
-            return [row["study_id"] for row in data if row.get("study_id")]
-        return [str(x) for x in data]
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames or "study_id" not in r.fieldnames:
+            return list(dict.fromkeys(row["study_id"] for row in data if row.get("study_id")))
+        return list(dict.fromkeys(str(x) for x in data))
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Plain csv.reader + one column index: no per-row dict, and only the id column is kept
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or "study_id" not in header:
             return []
-        return [row["study_id"] for row in r if row.get("study_id")]
+        i = header.index("study_id")
+        return list(dict.fromkeys(row[i] for row in reader if len(row) > i and row[i]))
 
 def read_researcher_ids(path: Path) -> List[str]:
+    """Distinct researcher ids in first-seen order, so pick_unique never returns one id twice."""
     if not path.exists():
         return []
     if path.suffix.lower() == ".json":
@@ -72,80 +116,105 @@ def read_researcher_ids(path: Path) -> List[str]:
         if isinstance(data, list) and data and isinstance(data[0], dict):
             key = "researcher_id" if "researcher_id" in data[0] else None
             if key:
-                return [row[key] for row in data if row.get(key)]
+                return list(dict.fromkeys(row[key] for row in data if row.get(key)))
             return []
-        return [str(x) for x in data]
-    with path.open("r", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        if not r.fieldnames or "researcher_id" not in r.fieldnames:
+        return list(dict.fromkeys(str(x) for x in data))
+    with path.open("r", encoding="utf-8", newline="") as f:
+        # Plain csv.reader + one column index: no per-row dict, and only the id column is kept
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or "researcher_id" not in header:
             return []
-        return [row["researcher_id"] for row in r if row.get("researcher_id")]
+        i = header.index("researcher_id")
+        return list(dict.fromkeys(row[i] for row in reader if len(row) > i and row[i]))
 
 # ---------------------------
 # Core generation
 # ---------------------------
 def pick_unique(researchers: List[str], forbid: Set[str], k: int) -> List[str]:
-    choices = [rid for rid in researchers if rid not in forbid]
-    random.shuffle(choices)
-    return choices[:k]
+    """
+    Up to k distinct researchers not in forbid. Sampling k + len(forbid) from the whole pool
+    leaves at least k allowed ones (when that many exist), so the pool is never copied or shuffled.
+    """
+    if k <= 0:
+        return []
+    picked = random.sample(researchers, min(k + len(forbid), len(researchers)))
+    return [rid for rid in picked if rid not in forbid][:k]
 
 def baseline_assignments(
     studies: List[str],
     researchers: List[str],
     pi_per_study: int,
-    coord_weights: Tuple[List[int], List[float]],
+    coord_cum_weights: Tuple[List[int], Tuple[float, ...]],
     ra_min: int,
     ra_max: int,
-) -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
+) -> Iterator[Tuple[str, str, str]]:
     for sid in studies:
         used_here: Set[str] = set()
 
         pis = pick_unique(researchers, used_here, max(1, pi_per_study))
         for rid in pis:
-            rows.append({"study_id": sid, "researcher_id": rid, "role": "PI"})
+            yield (sid, rid, "PI")
             used_here.add(rid)
 
-        k_coord = random.choices(coord_weights[0], weights=coord_weights[1], k=1)[0]
+        k_coord = random.choices(coord_cum_weights[0], cum_weights=coord_cum_weights[1], k=1)[0]
         coords = pick_unique(researchers, used_here, k_coord)
         for rid in coords:
-            rows.append({"study_id": sid, "researcher_id": rid, "role": "coordinator"})
+            yield (sid, rid, "coordinator")
             used_here.add(rid)
 
         k_ra = random.randint(ra_min, ra_max)
         ras = pick_unique(researchers, used_here, k_ra)
         for rid in ras:
-            rows.append({"study_id": sid, "researcher_id": rid, "role": "RA"})
+            yield (sid, rid, "RA")
             used_here.add(rid)
 
-    return rows
-
 def top_up_to_target(
-    rows: List[Dict[str, str]],
+    rows: Iterable[Tuple[str, str, str]],
     target_n: int,
     studies: List[str],
     researchers: List[str],
-    role_weights: Dict[str, float],
-) -> List[Dict[str, str]]:
-    if target_n <= 0 or len(rows) >= target_n:
-        return rows
+    role_cum_weights: Tuple[Tuple[str, ...], Tuple[float, ...]],
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Pass rows through, then add extra edges until at least target_n rows have been yielded.
+    Pairs are tracked as packed ints (study index * R + researcher index); studies and
+    researchers are already distinct, so the dedupe set never hashes id strings for drawn candidates.
+    """
+    # Index lookups are only needed for the passed-through rows; top-up draws are indices
+    study_index = {sid: i for i, sid in enumerate(studies)}
+    researcher_index = {rid: i for i, rid in enumerate(researchers)}
+    R = len(researchers)
+
+    used_pairs: Set[int] = set()
+    count = 0
+    for r in rows:
+        used_pairs.add(study_index[r[0]] * R + researcher_index[r[1]])
+        count += 1
+        yield r
+    if target_n <= 0 or count >= target_n:
+        return
 
-    used_pairs: Set[Tuple[str, str]] = {(r["study_id"], r["researcher_id"]) for r in rows}
-    role_labels = list(role_weights.keys())
-    role_probs = [role_weights[k] for k in role_labels]
+    role_labels, role_cum = role_cum_weights
 
     attempts = 0
-    max_attempts = (target_n - len(rows)) * 20
-    while len(rows) < target_n and attempts < max_attempts:
-        attempts += 1
-        sid = random.choice(studies)
-        rid = random.choice(researchers)
-        if (sid, rid) in used_pairs:
-            continue
-        role = random.choices(role_labels, weights=role_probs, k=1)[0]
-        rows.append({"study_id": sid, "researcher_id": rid, "role": role})
-        used_pairs.add((sid, rid))
-    return rows
+    max_attempts = (target_n - count) * 20
+    while count < target_n and attempts < max_attempts:
+        # Candidates and their roles are drawn in blocks sized to the remaining shortfall
+        batch = min(4 * (target_n - count), max_attempts - attempts)
+        sis = random.choices(range(len(studies)), k=batch)
+        ris = random.choices(range(R), k=batch)
+        roles = random.choices(role_labels, cum_weights=role_cum, k=batch)
+        for si, ri, role in zip(sis, ris, roles):
+            attempts += 1
+            key = si * R + ri
+            if key in used_pairs:
+                continue
+            yield (studies[si], researchers[ri], role)
+            used_pairs.add(key)
+            count += 1
+            if count >= target_n:
+                break
 
 # ---------------------------
 # Main
@@ -174,11 +243,11 @@ def main():
     # Load pools
     studies = read_study_ids(Path(args.studies_file), Path(args.alt_studies_file))
     if not studies:
-        studies = [str(uuid.uuid4()) for _ in range(args.study_pool)]
+        studies = make_ids(args.study_pool)
 
     researchers = read_researcher_ids(Path(args.researchers_file))
     if not researchers:
-        researchers = [str(uuid.uuid4()) for _ in range(args.researcher_pool)]
+        researchers = make_ids(args.researcher_pool)
 
     # Guardrails (FIXED: use underscore, not hyphen)
     if args.pi_per_study < 1:
@@ -188,38 +257,42 @@ def main():
     if args.ra_max < args.ra_min:
         args.ra_max = max(args.ra_min, 1)
 
-    # Build baseline and top up if needed
+    # Baseline and top-up are generators; rows are produced as the writer pulls them
     rows = baseline_assignments(
         studies=studies,
         researchers=researchers,
         pi_per_study=args.pi_per_study,
-        coord_weights=(COORD_CHOICES, COORD_WEIGHTS),
+        coord_cum_weights=(COORD_CHOICES, COORD_CUM_WEIGHTS),
         ra_min=args.ra_min,
         ra_max=args.ra_max,
     )
 
-    if args.n and len(rows) < args.n:
+    if args.n:
         rows = top_up_to_target(
             rows=rows,
             target_n=args.n,
             studies=studies,
             researchers=researchers,
-            role_weights=TOPUP_ROLE_WEIGHTS,
+            role_cum_weights=(TOPUP_ROLE_LABELS, TOPUP_ROLE_CUM_WEIGHTS),
         )
 
     # Write
     if args.json_out or args.outfile.lower().endswith(".json"):
         out = args.outfile if args.outfile.lower().endswith(".json") else "study_researchers.json"
-        with open(out, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {len(rows)} study_researchers rows to JSON: {out}")
+        n_rows = stream_json(rows, out)
+        print(f"Wrote {n_rows} study_researchers rows to JSON: {out}")
     else:
-        fieldnames = ["study_id","researcher_id","role"]
-        with open(args.outfile, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            w.writerows(rows)
-        print(f"Wrote {len(rows)} study_researchers rows to CSV: {args.outfile}")
+        # csv.writer, not hand-formatted lines: study/researcher ids come from user files
+        # and may need quoting
+        with open(args.outfile, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as f:
+            w = csv.writer(f)
+            w.writerow(FIELDNAMES)
+            # zip() pulls one tick per row it passes on, so the next tick is the row count;
+            # writerows stays a single C-level call
+            ticks = itertools.count()
+            w.writerows(map(itemgetter(0), zip(rows, ticks)))
+            n_rows = next(ticks)
+        print(f"Wrote {n_rows} study_researchers rows to CSV: {args.outfile}")
 
 if __name__ == "__main__":
     main()